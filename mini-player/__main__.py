@@ -1,4 +1,9 @@
-from app import start_app
+import sys
 
 if __name__ == "__main__":
-    start_app()
+    try:
+        from app import start_app
+        start_app()
+    except ImportError as e:
+        # Missing dependency (e.g. no hotkey library): short message, non-zero status
+        sys.exit(f"Error: {e}")
@@ -1,29 +1,40 @@
 import tkinter as tk
+import tkinter.font as tkfont
 from utils import place_bottom_right, toggle_window_size
-from handlers import on_enter, on_up, on_down, toggle_mode
-from modes.notes import core as notes_core
-from themes import get_current_theme, switch_theme, get_available_themes, get_theme_info, current_theme
+from handlers import on_enter, on_up, on_down, toggle_mode, schedule_see, get_mode_core, display_notes
+from themes import get_current_theme, get_current_theme_key
+import sys
 import threading
+import queue
 import atexit
+import logging
 import themes
+from config import MINI_GLOBAL_HOTKEY
 
-# Try pynput first for global hotkeys, then fallback to keyboard
-USE_PYNPUT = False
-try:
-    from pynput import keyboard as pynput_keyboard
-    USE_PYNPUT = True
-except ImportError:
-    print("pynput not found, falling back to 'keyboard' library for hotkeys.")
+log = logging.getLogger(__name__)
+
+def load_hotkey_backend():
+    """Import the hotkey library when hotkeys are set up, not at module import.
+
+    Tries pynput first, then falls back to keyboard. Returns (uses_pynput, module).
+    """
+    try:
+        from pynput import keyboard as pynput_keyboard
+        return True, pynput_keyboard
+    except ImportError:
+        log.warning("pynput not found, falling back to 'keyboard' library for hotkeys.")
     try:
         import keyboard as simple_keyboard
     except ImportError:
-        print("Error: Neither pynput nor keyboard library found. Please install one.")
-        exit()
+        raise ImportError("Neither pynput nor keyboard library found. Please install one.")
+    return False, simple_keyboard
 
 # Global state for window visibility, dragging, and sizing
 is_visible = True
 is_expanded = False  # Track window size state
-drag_data = {"x": 0, "y": 0}
+CONSOLE_HEIGHTS = {False: 8, True: 20}  # Console lines in compact / expanded mode
+drag_data = {"x": 0, "y": 0, "top": None, "pos": None}
+cleaned_up = False  # Set by the first cleanup_on_exit call
 
 def toggle_window(root):
     """Toggle the visibility of the application window."""
@@ -45,162 +56,228 @@ def toggle_size(root):
     if is_expanded:
         # Expanded mode - icon points southeast (down-right)
         size_toggle_btn.config(text="⇲")  # Southeast arrow
-        # Increase console height for expanded mode
-        for console in consoles.values():
-            console.config(height=20)  # More lines for expanded mode
         # Adjust input field for expanded mode
         if entry_widget:
-            entry_widget.config(font=("JetBrains Mono", 14, "bold"))  # Larger font
+            fonts["entry"].configure(size=14)  # Larger font
             # Update input padding for expanded mode
             entry_widget.pack_configure(padx=(1, 4), pady=0, ipady=0)
     else:
         # Compact mode - icon points northwest (up-left) 
         size_toggle_btn.config(text="⇱")  # Northwest arrow
-        # Reset to default height
-        for console in consoles.values():
-            console.config(height=8)   # Original height for compact mode
         # Reset input field to default
         if entry_widget:
-            entry_widget.config(font=("JetBrains Mono", 12, "bold"))  # Default font
+            fonts["entry"].configure(size=12)  # Default font
             # Reset input padding to default
             entry_widget.pack_configure(padx=(2, 5), pady=0, ipady=0)
+    
+    # Only the visible console is resized now; the others catch up when shown
+    sync_console_height(get_active_console())
+
+def sync_console_height(console):
+    """Give a console the line height of the current size mode, if it differs"""
+    height = CONSOLE_HEIGHTS[is_expanded]
+    if console is not None and console.text_height != height:
+        console.config(height=height)
+        console.text_height = height
 
 
 def start_drag(event):
     """Start dragging the window"""
     drag_data["x"] = event.x
     drag_data["y"] = event.y
+    drag_data["top"] = event.widget.winfo_toplevel()
+    drag_data["pos"] = None
 
 def on_drag(event):
     """Handle window dragging"""
-    x = event.widget.winfo_pointerx() - drag_data["x"]
-    y = event.widget.winfo_pointery() - drag_data["y"]
-    event.widget.winfo_toplevel().geometry(f"+{x}+{y}")
+    # Motion events carry root coordinates, so no pointer queries are needed
+    pos = (event.x_root - drag_data["x"], event.y_root - drag_data["y"])
+    if pos == drag_data["pos"]:
+        return # Repeated coordinates; the window is already there
+    drag_data["pos"] = pos
+    top = drag_data["top"]
+    top.tk.call("wm", "geometry", top._w, "+%d+%d" % pos)
 
 def force_focus_to_entry(event, entry):
     """Force focus to input entry on any click"""
     entry.focus_set()
     return "break"
 
-# pynput specific hotkey handler
-def on_press(key, root, listener_ref):
-    """Callback function for pynput.keyboard listener."""
+# Global hotkeys: listener threads only enqueue a tag, the Tk thread drains
+hotkey_queue = queue.SimpleQueue()
+hotkeys_stopped = threading.Event()  # Set once the app is shutting down
+HOTKEY_POLL_MS = 30  # ~30Hz drain rate
+
+def queue_hotkey(tag):
+    """Listener-thread callback: enqueue a hotkey tag unless shutting down"""
+    if not hotkeys_stopped.is_set():
+        hotkey_queue.put_nowait(tag)
+
+def quit_app(root):
+    """Close the application window"""
+    root.destroy()
+
+HOTKEY_ACTIONS = {
+    "toggle": toggle_window,
+    "resize": toggle_size,
+    "quit": quit_app,
+}
+
+def create_hotkey_listener(pynput_keyboard):
+    """Build a pynput GlobalHotKeys listener that only queues hotkey tags"""
+    return pynput_keyboard.GlobalHotKeys({
+        '<ctrl>+<shift>+m': lambda: queue_hotkey("toggle"),
+        '<ctrl>+<shift>+s': lambda: queue_hotkey("resize"),
+        '<esc>': lambda: queue_hotkey("quit"),
+    })
+
+def drain_hotkeys(root):
+    """Run queued hotkey actions on the Tk main thread"""
     try:
-        # Check for Ctrl+Shift+M for toggling window
-        if hasattr(key, 'char') and key.char == 'm' and \
-           key.ctrl and key.shift:
-            root.after(0, lambda: toggle_window(root))
-        # Check for Ctrl+Shift+S for toggling size
-        elif hasattr(key, 'char') and key.char == 's' and \
-             key.ctrl and key.shift:
-            root.after(0, lambda: toggle_size(root))
-        # Check for Escape key to exit (global)
-        elif key == pynput_keyboard.Key.esc:
-            root.after(0, root.destroy)
-            return False
-    except AttributeError:
+        while not hotkeys_stopped.is_set():
+            tag = hotkey_queue.get_nowait()
+            HOTKEY_ACTIONS[tag](root)
+            if tag == "quit":
+                hotkeys_stopped.set()
+                return
+    except queue.Empty:
         pass
+    if not hotkeys_stopped.is_set():
+        root.after(HOTKEY_POLL_MS, drain_hotkeys, root)
 
 def cleanup_on_exit():
     """Cleanup function called when app exits"""
+    # Runs from both the window close handler and atexit; only the first call counts
+    global cleaned_up
+    if cleaned_up:
+        return
+    cleaned_up = True
+    # Music mode is imported lazily; don't pull in pygame just to shut it down
+    audio_engine = sys.modules.get("modes.music.audio_engine")
+    if audio_engine is None:
+        return
     try:
-        from modes.music.audio_engine import cleanup_audio_engine
-        cleanup_audio_engine()
+        audio_engine.cleanup_audio_engine()
         print("Music engine cleaned up")
-    except ImportError:
-        pass
     except Exception as e:
         print(f"Error during music cleanup: {e}")
 
-def scroll_console(console, direction, smooth=True):
-    """Scroll console content smoothly"""
-    if smooth:
-        # Smooth scrolling - multiple small steps
-        steps = 10
-        scroll_amount = 1
-        delay = 20  # milliseconds between steps
-        
-        def smooth_scroll_step(step):
-            if step < steps:
-                if direction == "up":
-                    console.yview_scroll(-scroll_amount, "units")
-                elif direction == "down":
-                    console.yview_scroll(scroll_amount, "units")
-                console.after(delay, lambda: smooth_scroll_step(step + 1))
-        
-        smooth_scroll_step(0)
-    else:
-        # Original scrolling
-        if direction == "up":
-            console.yview_scroll(-3, "units")
-        elif direction == "down":
-            console.yview_scroll(3, "units")
+SCROLL_UNITS = 10  # Lines moved per Up/Down press
+
+def scroll_console(console, direction, units=SCROLL_UNITS):
+    """Scroll console content in a single step (one redraw per key press)"""
+    if direction == "up":
+        console.yview_scroll(-units, "units")
+    elif direction == "down":
+        console.yview_scroll(units, "units")
 
 def cycle_theme(console, mode_status_label, entry):
     """Cycle through available themes"""
-    themes_list = themes.get_available_themes()
-    current_key = themes.current_theme
-    current_idx = themes_list.index(current_key)
-    next_idx = (current_idx + 1) % len(themes_list)
-    next_theme = themes_list[next_idx]
-    
+    # Keyed by the current name, so this also follows /theme switches
+    current_key = get_current_theme_key()
+    next_theme = themes.NEXT_THEME[current_key]
+    if next_theme == current_key:
+        return # Only one theme; re-applying the same colours would just flicker
     if themes.switch_theme(next_theme):
-        apply_theme_to_widgets(console, mode_status_label, entry)
-        theme_info = themes.get_theme_info()
-        console.insert(tk.END, f"\n🎨 {theme_info}\n", "accent")
-        console.see(tk.END)
-
-def apply_theme_to_widgets(console, mode_status_label, entry):
-    """Apply current theme to all widgets"""
-    theme = get_current_theme()
-    
-    # Update widget colors
-    console.config(bg=theme["console_bg"], fg=theme["text"], 
-                  insertbackground=theme["accent"], selectbackground=theme["accent"])
-    entry.config(bg=theme["console_bg"], fg=theme["text"], 
-                insertbackground=theme["accent"], selectbackground=theme["accent"])
-    
-    # Update console tags
-    console.tag_config("success", foreground=theme["success"])
-    console.tag_config("warning", foreground=theme["warning"]) 
-    console.tag_config("error", foreground=theme["error"])
-    console.tag_config("accent", foreground=theme["accent"])
-    console.tag_config("dim", foreground=theme["dim"])
-
-# Global reference for entry widget and consoles
+        theme = get_current_theme()
+        apply_theme_to_widgets(theme, mode_status_label, entry)
+        console.insert(tk.END, f"\n🎨 Current theme: {theme['name']}\n", "accent")
+        schedule_see(console)
+
+# Console text tags, each coloured by the theme key of the same name
+CONSOLE_TAGS = ("success", "warning", "error", "accent", "dim")
+
+# Tcl proc that sets every console tag colour in one call from Python
+TAG_COLORS_PROC = """
+proc mini_tag_colors {w success warning error accent dim} {
+    foreach tag {success warning error accent dim} {
+        $w tag configure $tag -foreground [set $tag]
+    }
+}
+"""
+
+def configure_console_tags(console, theme):
+    """Apply theme colours to the standard console tags"""
+    colors = tuple(theme[tag] for tag in CONSOLE_TAGS)
+    if colors != console.tag_colors: # Skip the call when nothing would change
+        console.tk.call("mini_tag_colors", console._w, *colors)
+        console.tag_colors = colors
+
+def apply_theme_to_widgets(theme, mode_status_label, entry):
+    """Apply a theme to all consoles and the entry"""
+    # Shared colours, applied with one configure call per widget
+    colors = {"bg": theme["console_bg"], "fg": theme["text"],
+              "insertbackground": theme["accent"], "selectbackground": theme["accent"]}
+    entry.configure(**colors)
+    # Every console, not just the visible one, so switching modes keeps the theme
+    for console in consoles.values():
+        console.configure(**colors)
+        configure_console_tags(console, theme)
+
+class ConsoleText(tk.Text):
+    """Read-only console Text that keeps a running count of its lines"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.line_count = 1 # An empty Text still has one line
+        self.unseen = False # Text inserted since the last scroll to end, see schedule_see
+        self.text_height = kwargs.get("height") # Lines, kept in step by sync_console_height
+        self.tag_colors = () # CONSOLE_TAGS colours last applied, see configure_console_tags
+
+    def insert(self, index, chars, *args):
+        super().insert(index, chars, *args)
+        # Extra args alternate tags, text, tags...; count newlines in every text chunk
+        self.line_count += chars.count("\n") + sum(text.count("\n") for text in args[1::2])
+        self.unseen = True
+
+    def delete(self, index1, index2=None):
+        super().delete(index1, index2)
+        # Deletes are rare (trim/clear), so just resync from Tk's native line count
+        self.line_count = self.tk.getint(self.tk.call(self._w, 'count', '-lines', '1.0', 'end'))
+
+# Global reference for entry widget, consoles and shared fonts
 entry_widget = None
+hotkey_listener = None # pynput listener, started once the window is up
 consoles = {}
+fonts = {}
 active_mode_name = "bash" # Start with bash
 
 def get_active_console():
     """Helper to get the currently visible console widget"""
     return consoles.get(active_mode_name)
 
-def start_app():
-    global entry_widget, consoles, active_mode_name, size_toggle_btn
-    
-    root = tk.Tk()
-    root.overrideredirect(True)
-    root.title("Mini Player")
-    root.resizable(False, False)
-    root.attributes('-topmost', True)
-    root.attributes('-alpha', 0.95)
+def create_fonts(root):
+    """Create named fonts once so widgets share them instead of re-resolving tuples"""
+    fonts["handle"] = tkfont.Font(root, family="Fira Code", size=12)
+    fonts["header"] = tkfont.Font(root, family="Fira Code", size=10)
+    fonts["console"] = tkfont.Font(root, family="Cascadia Code", size=10)
+    fonts["prompt"] = tkfont.Font(root, family="JetBrains Mono", size=14, weight="bold")
+    fonts["entry"] = tkfont.Font(root, family="JetBrains Mono", size=12, weight="bold")
 
-    # Register cleanup function
-    atexit.register(cleanup_on_exit)
+def setup_hotkeys(root):
+    """Install hotkeys for whichever backend is available.
 
-    # Hotkey setup
-    if USE_PYNPUT:
-        listener = pynput_keyboard.Listener(on_press=lambda k: on_press(k, root, listener))
+    Returns the pynput listener so the caller can stop it, or None.
+    """
+    try:
+        uses_pynput, hotkey_lib = load_hotkey_backend()
+    except ImportError as e:
+        # Runs from a Tk callback after startup, so don't abort the app over it
+        print(f"Warning: {e}")
+        uses_pynput, hotkey_lib = False, None
+    if uses_pynput:
+        listener = create_hotkey_listener(hotkey_lib)
         listener.start()
+        drain_hotkeys(root) # Poll only when a background listener can queue hotkeys
         print("Using pynput for global hotkeys:")
         print("  Ctrl+Shift+M to toggle visibility")
         print("  Ctrl+Shift+S to toggle size")  
         print("  Escape to exit")
-    else:
+        return listener
+    elif MINI_GLOBAL_HOTKEY and hotkey_lib:
         try:
-            simple_keyboard.add_hotkey('ctrl+shift+m', lambda: toggle_window(root))
-            simple_keyboard.add_hotkey('ctrl+shift+s', lambda: toggle_size(root))
+            hotkey_lib.add_hotkey('ctrl+shift+m', lambda: queue_hotkey("toggle"))
+            hotkey_lib.add_hotkey('ctrl+shift+s', lambda: queue_hotkey("resize"))
+            drain_hotkeys(root)
             print("Using 'keyboard' library for global hotkeys:")
             print("  Ctrl+Shift+M to toggle visibility")
             print("  Ctrl+Shift+S to toggle size")
@@ -208,6 +285,30 @@ def start_app():
             print(f"Warning: Could not set global hotkey: {e}")
         
         root.bind_all("<Escape>", lambda e: root.destroy())
+    else:
+        # Window-local bindings only: no background hook thread. Visibility
+        # toggle is left out since a hidden window could not get focus back.
+        root.bind_all("<Control-Shift-S>", lambda e: toggle_size(root))
+        print("Using window-local hotkeys (set MINI_GLOBAL_HOTKEY=true for global):")
+        print("  Ctrl+Shift+S to toggle size")
+        
+        root.bind_all("<Escape>", lambda e: root.destroy())
+    return None
+
+def start_app():
+    global entry_widget, consoles, active_mode_name, size_toggle_btn
+    
+    root = tk.Tk()
+    root.overrideredirect(True)
+    root.title("Mini Player")
+    root.resizable(False, False)
+    root.attributes('-topmost', True)
+    root.attributes('-alpha', 0.95)
+    create_fonts(root)
+    root.tk.eval(TAG_COLORS_PROC)
+
+    # Register cleanup function
+    atexit.register(cleanup_on_exit)
 
     place_bottom_right(root)
     
@@ -226,7 +327,7 @@ def start_app():
     # Drag handle (small circle)
     drag_handle = tk.Label(
         header_frame, text="●", bg=THEME["border"], fg=THEME["accent"],
-        font=("Fira Code", 12), width=2, cursor="fleur"
+        font=fonts["handle"], width=2, cursor="fleur"
     )
     drag_handle.pack(side=tk.LEFT, pady=3)
     
@@ -237,14 +338,14 @@ def start_app():
     # Mode + Status combined label
     mode_status_label = tk.Label(
         header_frame, text="[BASH] Ready", bg=THEME["border"], fg=THEME["text"],
-        font=("Fira Code", 10), anchor="w"
+        font=fonts["header"], anchor="w"
     )
     mode_status_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(4, 4), pady=3)
     
     # Size toggle button (compact indicator)
     size_toggle_btn = tk.Label(
         header_frame, text="⇱", bg=THEME["border"], fg=THEME["dim"],
-        font=("Fira Code", 10), cursor="hand2", width=2
+        font=fonts["header"], cursor="hand2", width=2
     )
     size_toggle_btn.pack(side=tk.RIGHT, pady=3, padx=(0, 4))
     size_toggle_btn.bind("<Button-1>", lambda e: toggle_size(root))
@@ -261,27 +362,24 @@ def start_app():
 
     # Create a console for each mode
     for mode_name in ["bash", "chat", "notes", "music"]:
-        console = tk.Text(
-            console_frame, height=8, bg=THEME["console_bg"], fg=THEME["text"],
+        console = ConsoleText(
+            console_frame, height=CONSOLE_HEIGHTS[is_expanded], bg=THEME["console_bg"], fg=THEME["text"],
             insertbackground=THEME["accent"], bd=0, highlightthickness=0,
-            font=("Cascadia Code", 10), wrap=tk.WORD,
+            font=fonts["console"], wrap=tk.WORD,
             selectbackground=THEME["accent"], selectforeground=THEME["bg"],
             padx=6, pady=8, cursor="arrow",
             spacing1=2, spacing3=1
         )
         # Configure text tags for each console
-        console.tag_config("success", foreground=THEME["success"])
-        console.tag_config("warning", foreground=THEME["warning"])
-        console.tag_config("error", foreground=THEME["error"])
-        console.tag_config("accent", foreground=THEME["accent"])
-        console.tag_config("dim", foreground=THEME["dim"])
+        configure_console_tags(console, THEME)
         
-        # Disable editing and manage focus
-        console.bind("<Key>", lambda e: "break")
-        console.bind("<Button-1>", lambda e, entry=entry_widget: force_focus_to_entry(e, entry))
+        # Read-only behaviour comes from a shared bindtag placed after the widget's
+        # own tag, so per-widget bindings (chat scroll detection) still run first
+        tags = console.bindtags()
+        console.bindtags((tags[0], "ReadOnlyConsole") + tags[1:])
 
         consoles[mode_name] = console
-        # Place console in grid, it will be hidden until lifted
+        # All consoles share one grid cell; only the active one stays mapped
         console.grid(row=0, column=0, sticky="nsew")
 
     # Bottom separator
@@ -296,15 +394,16 @@ def start_app():
     # Prompt symbol
     prompt_label = tk.Label(
         input_frame, text=">", bg=THEME["console_bg"], fg=THEME["accent"], 
-        font=("JetBrains Mono", 14, "bold")
+        font=fonts["prompt"]
     )
     prompt_label.pack(side=tk.LEFT, padx=(2, 2), pady=1)
 
     # Entry field (full width) - ENHANCED
+    entry_var = tk.StringVar(root)
     entry = tk.Entry(
-        input_frame, bg=THEME["console_bg"], fg=THEME["text"],
+        input_frame, textvariable=entry_var, bg=THEME["console_bg"], fg=THEME["text"],
         insertbackground=THEME["accent"], bd=0, highlightthickness=0,
-        font=("JetBrains Mono", 12, "bold"), selectbackground=THEME["accent"],
+        font=fonts["entry"], selectbackground=THEME["accent"],
         selectforeground=THEME["bg"], insertwidth=3
     )
     entry.pack(fill=tk.X, expand=True, padx=(2, 15), pady=0, ipady=0)
@@ -315,19 +414,21 @@ def start_app():
     # Set initial focus
     entry.focus_set()
     
-    # Override console click to focus entry
-    for console in consoles.values():
-        console.bind("<Button-1>", lambda e, entry=entry: force_focus_to_entry(e, entry))
+    # Disable editing and send console clicks to the entry, once for every console
+    root.bind_class("ReadOnlyConsole", "<Key>", "break")  # Plain Tcl script, no Python callback per key
+    root.bind_class("ReadOnlyConsole", "<Button-1>", lambda e: force_focus_to_entry(e, entry))
     
     # Bind events
-    entry.bind("<Return>", lambda e: on_enter(entry, get_active_console, mode_status_label))
-    entry.bind("<Control-Up>", lambda e: on_up(entry))
-    entry.bind("<Control-Down>", lambda e: on_down(entry))
+    entry.bind("<Return>", lambda e: on_enter(entry, entry_var, get_active_console, mode_status_label))
+    entry.bind("<Control-Up>", lambda e: on_up(entry, entry_var))
+    entry.bind("<Control-Down>", lambda e: on_down(entry, entry_var))
     
     # Pass the new active_mode_name variable to toggle_mode
     def mode_toggle_handler(event):
         global active_mode_name
-        active_mode_name = toggle_mode(consoles, mode_status_label, prompt_label, THEME)
+        # No theme argument: toggle_mode reads the live one, which Ctrl+T may have changed
+        active_mode_name = toggle_mode(consoles, mode_status_label, prompt_label)
+        sync_console_height(consoles[active_mode_name])
         return "break"
     entry.bind("<Control-m>", mode_toggle_handler)
     
@@ -341,28 +442,38 @@ def start_app():
     # Window size toggle
     entry.bind("<Control-s>", lambda e: toggle_size(root))
     
-    # Force focus on window activation
-    root.bind("<FocusIn>", lambda e: entry.focus_set())
+    # Force focus on window activation (event-driven; deferred to idle so we
+    # don't re-enter focus handling while Tk is still dispatching FocusIn).
+    # The entry's own FocusIn needs nothing, which also stops a refocus loop.
+    root.bind("<FocusIn>", lambda e: e.widget is not entry and root.after_idle(entry.focus_set))
     
-    # Initialize modes
-    notes_core.load_notes()
-    
-    # Welcome message in BASH console
-    consoles["bash"].insert(tk.END, ">> Mini Player Ready\n", "accent")
-    consoles["bash"].insert(tk.END, f"   Theme: {THEME['name']}\n", "dim")
-    consoles["bash"].insert(tk.END, "   Modes: BASH → CHAT → NOTES → MUSIC\n", "dim")
-    consoles["bash"].insert(tk.END, "   Ctrl+M=modes • Ctrl+T=themes • Ctrl+S=size • ↑↓=scroll\n", "dim")
-    consoles["bash"].insert(tk.END, "   Global: Ctrl+Shift+M=toggle • Ctrl+Shift+S=resize\n", "dim")
-    consoles["bash"].see(tk.END)
-
-    # Initial content for other consoles
-    notes_core.display_notes(consoles["notes"])
+    # Welcome banner, notes and hotkeys are set up once the window has painted,
+    # so neither the inserts, the notes file I/O nor the slow pynput/keyboard
+    # import hold up the first frame
+    def post_init():
+        global hotkey_listener
+        help_lines = "".join((
+            f"   Theme: {THEME['name']}\n",
+            "   Modes: BASH → CHAT → NOTES → MUSIC\n",
+            "   Ctrl+M=modes • Ctrl+T=themes • Ctrl+S=size • ↑↓=scroll\n",
+            "   Global: Ctrl+Shift+M=toggle • Ctrl+Shift+S=resize\n",
+        ))
+        consoles["bash"].insert(tk.END, ">> Mini Player Ready\n", "accent", help_lines, "dim")
+        schedule_see(consoles["bash"])
+
+        get_mode_core("notes").load_notes()
+        display_notes(consoles["notes"])
+        schedule_see(consoles["notes"])
+
+        hotkey_listener = setup_hotkeys(root)
+    root.after_idle(post_init)
     # A placeholder for music, can be expanded
-    consoles["music"].insert(tk.END, ">> Music Mode\n", "accent")
-    consoles["music"].insert(tk.END, "   Type 'help' for commands\n", "dim")
+    consoles["music"].insert(tk.END, ">> Music Mode\n", "accent", "   Type 'help' for commands\n", "dim")
     
-    # Lift the initial console to the top
-    consoles[active_mode_name].lift()
+    # Unmap the other consoles so hidden Text widgets skip layout and redraws
+    for mode_name, console in consoles.items():
+        if mode_name != active_mode_name:
+            console.grid_remove()
     
     # Cleanup function for window close
     def on_closing():
@@ -373,7 +484,9 @@ def start_app():
     
     root.mainloop()
 
-    # Cleanup pynput listener
-    if USE_PYNPUT and listener.is_alive():
+    # Cleanup pynput listener; it may already be gone, so only join a live one
+    hotkeys_stopped.set()
+    listener = hotkey_listener
+    if listener is not None and listener.is_alive():
         listener.stop()
-        listener.join()
\ No newline at end of file
+        listener.join(timeout=1.0)
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -7,52 +8,75 @@ project_root = Path(__file__).parent.parent
 env_path = project_root / '.env'
 load_dotenv(env_path)
 
+# Shorthands for reading the settings below. Settings come from one plain-dict
+# snapshot taken after .env is loaded, so later environ changes don't leak in
+_env = os.environ.copy()
+_expand = os.path.expanduser
+files_dir = project_root / "files"
+
+def _path(key, default):
+    """Path setting from the environment, with ~ expanded"""
+    return _expand(_env.get(key, str(default)))
+
+def _int(key, default):
+    """Integer setting from the environment"""
+    value = _env.get(key)
+    return default if value is None else int(value)
+
+def _float(key, default):
+    """Float setting from the environment"""
+    value = _env.get(key)
+    return default if value is None else float(value)
+
 # Configuration settings  
-MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
+MISTRAL_API_KEY = _env.get("MISTRAL_API_KEY")
 
 # TEXT MODEL - for regular chat (your existing model)
-MISTRAL_MODEL = os.getenv("MISTRAL_MODEL", "mistral-medium")
+MISTRAL_MODEL = _env.get("MISTRAL_MODEL", "mistral-medium")
 
 # VISION MODEL - FIXED: Use correct vision model name
-MISTRAL_VISION_MODEL = os.getenv("MISTRAL_VISION_MODEL", "pixtral-large-latest")
+MISTRAL_VISION_MODEL = _env.get("MISTRAL_VISION_MODEL", "pixtral-large-latest")
 
-MISTRAL_URL = os.getenv("MISTRAL_URL", "https://api.mistral.ai/v1/chat/completions")
+MISTRAL_URL = _env.get("MISTRAL_URL", "https://api.mistral.ai/v1/chat/completions")
 # Provide safe defaults for file and directory paths
-NOTES_FILE = os.path.expanduser(os.getenv("NOTES_FILE", str(project_root / "files" / "notes.txt")))
+NOTES_FILE = _path("NOTES_FILE", files_dir / "notes.txt")
 
 # Enhanced chat history and memory configuration
-CHAT_HISTORY_DIR = os.path.expanduser(os.getenv("CHAT_HISTORY_DIR", str(project_root / "files" / "history")))
-CHAT_HISTORY_LENGTH = int(os.getenv("CHAT_HISTORY_LENGTH", "20"))
+CHAT_HISTORY_DIR = _path("CHAT_HISTORY_DIR", files_dir / "history")
+CHAT_HISTORY_LENGTH = _int("CHAT_HISTORY_LENGTH", 20)
 
 # Memory system settings
-MEMORY_DIR = os.path.expanduser(os.getenv("MEMORY_DIR", str(project_root / "files" / "memory")))
-AUTO_COMPRESS_THRESHOLD = int(os.getenv("AUTO_COMPRESS_THRESHOLD", "40"))
-FACT_IMPORTANCE_THRESHOLD = float(os.getenv("FACT_IMPORTANCE_THRESHOLD", "0.6"))
+MEMORY_DIR = _path("MEMORY_DIR", files_dir / "memory")
+AUTO_COMPRESS_THRESHOLD = _int("AUTO_COMPRESS_THRESHOLD", 40)
+FACT_IMPORTANCE_THRESHOLD = _float("FACT_IMPORTANCE_THRESHOLD", 0.6)
 
 # Music configuartion folder
-MUSIC_DIR = os.path.expanduser(os.getenv("MUSIC_DIR", str(project_root / "files" / "music")))
+MUSIC_DIR = _path("MUSIC_DIR", files_dir / "music")
 
 # Screenshots folder
-SCREENSHOTS_DIR = os.path.expanduser(os.getenv("SCREENSHOTS_DIR", str(project_root / "screenshots")))
+SCREENSHOTS_DIR = _path("SCREENSHOTS_DIR", project_root / "screenshots")
 
 # Vision settings
-SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", "75"))
-MAX_IMAGE_DIMENSION = int(os.getenv("MAX_IMAGE_DIMENSION", "1024"))
+SCREENSHOT_QUALITY = _int("SCREENSHOT_QUALITY", 75)
+MAX_IMAGE_DIMENSION = _int("MAX_IMAGE_DIMENSION", 1024)
 
 # Validation
 if not MISTRAL_API_KEY:
     raise ValueError("MISTRAL_API_KEY must be set in environment variables or .env file")
 
-DEBUG = os.getenv("DEBUG", "False").lower() == "true"
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+DEBUG = _env.get("DEBUG", "False").lower() == "true"
+LOG_LEVEL = _env.get("LOG_LEVEL", "INFO")
+
+# Global hook for the 'keyboard' fallback (pynput is always global)
+MINI_GLOBAL_HOTKEY = _env.get("MINI_GLOBAL_HOTKEY", "False").lower() == "true"
 
 # FIXED: Updated vision-capable models list (December 2024)
-VISION_MODELS = [
+VISION_MODELS = frozenset({
     "pixtral-large-latest",     # Current best vision model
     "pixtral-12b-latest",       # Alternative vision model  
     "pixtral-12b-2409",         # Specific version
     # Note: mistral-medium/small models don't actually support vision
-]
+})
 
 def get_vision_model():
     """Get the model to use for vision calls"""
@@ -62,6 +86,7 @@ def get_text_model():
     """Get the model to use for regular text calls"""
     return MISTRAL_MODEL
 
+@lru_cache(maxsize=None)
 def supports_vision(model_name=None):
     """Check if a model supports vision"""
     if model_name is None:
@@ -75,9 +100,9 @@ if DEBUG:
     print(f"Text Model: {MISTRAL_MODEL}")
     print(f"Vision Model: {MISTRAL_VISION_MODEL}")
     print(f"Vision Support: {supports_vision()}")
-    print(f"Available Vision Models: {VISION_MODELS}")
+    print(f"Available Vision Models: {sorted(VISION_MODELS)}")
 
 # ADDITIONAL: Validate vision model
 if MISTRAL_VISION_MODEL not in VISION_MODELS:
     print(f"WARNING: Vision model '{MISTRAL_VISION_MODEL}' may not support vision!")
-    print(f"Consider using one of: {VISION_MODELS}")
\ No newline at end of file
+    print(f"Consider using one of: {sorted(VISION_MODELS)}")
\ No newline at end of file
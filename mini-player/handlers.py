@@ -1,83 +1,232 @@
 from tkinter import END
 import os
-from modes.bash import core as bash_core
-from modes.chat import core as chat_core
-from modes.notes import core as notes_core
-from modes.music import core as music_core
-from themes import get_current_theme
-
-history = []
-history_index = -1
-current_dir = os.getcwd()
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+import importlib
+import queue
+import threading
+from functools import lru_cache, partial
+from themes import (THEMES, get_current_theme, get_current_theme_key, switch_theme,
+                    get_available_themes, get_theme_info)
+
+MAX_LINES = 500  # Console scrollback high watermark per mode
+TRIM_TO_LINES = 400  # Lines kept after a trim, so trims happen in batches
+HISTORY_SIZE = 500  # Commands kept for Ctrl+Up/Down recall
+SEE_DELAY_MS = 33  # Coalesce scroll-to-end requests to ~30Hz
+BASH_POLL_MS = 16  # How often streamed bash output is moved into the console
+MAX_OUTPUT_LINE = 2000  # Longer output lines are truncated; Tk wraps huge lines very slowly
+
 modes = ["bash", "chat", "notes", "music"]
-mode_index = 0
-mode = modes[mode_index]
-is_chat_first_visit = True # Track first visit to chat mode
-is_ai_replying = False # State lock for chat mode
+_mode_cycle = itertools.cycle(modes)
+
+@dataclass
+class AppState:
+    """Mutable handler state, updated in place so callers never need `global`"""
+    history: deque = field(default_factory=lambda: deque(maxlen=HISTORY_SIZE))
+    history_index: int = -1
+    current_dir: str = field(default_factory=os.getcwd)
+    mode: str = next(_mode_cycle)
+    chat_first_visit: bool = True
+    # State lock for chat mode; the reply may finish on a worker thread
+    ai_replying: threading.Event = field(default_factory=threading.Event)
+    bash_running: bool = False # State lock while a shell command streams output
+    notes_version: int = -1 # notes core VERSION last rendered by display_notes
+
+state = AppState()
+_see_pending = set()
+_mode_cores = {} # Mode name -> modes.<name>.core, or False if its import failed
+squeezed_lines = {} # Console -> {tag: full text} for truncated output lines
+_squeeze_ids = itertools.count()
+
+def get_mode_core(mode_name):
+    """Import a mode's core module on first use (chat/music pull in heavy deps).
+    Returns None if the mode's dependencies are missing; the failure is cached."""
+    core = _mode_cores.get(mode_name)
+    if core is None:
+        try:
+            core = importlib.import_module(f"modes.{mode_name}.core")
+        except ImportError as e:
+            print(f"Could not load {mode_name} mode: {e}")
+            core = False
+        _mode_cores[mode_name] = core
+    return core or None
+
+def schedule_see(console):
+    """Scroll console to the end, coalescing bursts into one see() per tick"""
+    if console in _see_pending:
+        return
+    _see_pending.add(console)
+    console.after(SEE_DELAY_MS, _flush_see, console)
+
+def _flush_see(console):
+    _see_pending.discard(console)
+    # see() makes Tk lay out the lines at the end, so skip it when nothing was added
+    if console.unseen:
+        console.unseen = False
+        console.see(END)
 
 def toggle_mode(consoles, mode_status_label, prompt_label, theme=None):
-    """Switch to the next mode and lift its console to the top."""
-    global mode_index, mode, is_chat_first_visit
-    mode_index = (mode_index + 1) % len(modes)
-    mode = modes[mode_index]
+    """Switch to the next mode and show its console in place of the last one."""
+    previous_console = consoles.get(state.mode)
+    mode = state.mode = next(_mode_cycle)
     
-    # Get the active console and lift it
+    # Map the new console and unmap the old one; hidden consoles still take
+    # inserts (e.g. a chat reply) but Tk skips their layout and redraws
     active_console = consoles.get(mode)
     if active_console:
-        active_console.lift()
+        active_console.grid()
+        if previous_console:
+            previous_console.grid_remove()
     
     # Get current theme config
     if theme is None:
         theme = get_current_theme()
     
-    config = theme["mode_config"][mode]
+    style = theme["mode_styles"][mode]
     
     # Update UI elements for the new mode
-    mode_status_label.config(text=f"{config['symbol']} Ready", fg=config['color'])
-    prompt_label.config(text=config['prompt'], fg=config['color'])
+    if mode == "bash" and state.bash_running:
+        update_status(mode_status_label, "Running...", mode) # Output is still streaming in
+    else:
+        mode_status_label.config(text=style.ready_text, fg=style.color)
+    prompt_label.config(text=style.prompt, fg=style.color)
     
     # Refresh content or show welcome message
     if mode == "notes":
         display_notes(active_console)
     elif mode == "music":
         display_music_status(active_console)
-    elif mode == "chat" and is_chat_first_visit:
+    elif mode == "chat" and state.chat_first_visit:
         if active_console:
             active_console.insert(END, ">> Mini here... what do we do today?\n", "accent")
-        is_chat_first_visit = False # Ensure message only appears once per session
+        state.chat_first_visit = False # Ensure message only appears once per session
     
     if active_console:
-        active_console.see(END)
+        schedule_see(active_console)
         
     return mode # Return the new mode name
 
 
+@lru_cache(maxsize=64)
+def _status_options(theme_key, mode, status_text):
+    """Label options for a status line; keyed by theme name, so a switch needs no invalidation"""
+    style = THEMES[theme_key]["mode_styles"][mode]
+    return {"text": f"{style.symbol} {status_text}", "fg": style.color}
+
 def update_status(mode_status_label, status_text, mode_override=None):
     """Update the status part of the integrated label"""
-    global mode
-    current_mode = mode_override or mode
-    theme = get_current_theme()
-    config = theme["mode_config"][current_mode]
+    current_mode = mode_override or state.mode
     
     # Update with mode + status
-    mode_status_label.config(text=f"{config['symbol']} {status_text}", fg=config['color'])
+    mode_status_label.config(**_status_options(get_current_theme_key(), current_mode, status_text))
 
-def on_ai_reply_complete():
+def on_ai_reply_complete(console=None):
     """Callback to reset the AI replying state."""
-    global is_ai_replying
-    is_ai_replying = False
+    state.ai_replying.clear()
+    if console is not None:
+        # The reply was streamed in after on_enter's trim, so cap scrollback now
+        trim_console(console)
+
+def run_bash(core, cmd, console, mode_status_label, entry):
+    output, state.current_dir = core.handle_command(cmd, state.current_dir)
+    if output is not None:
+        # Builtins answer immediately: echo and output go in together as one insert
+        console.insert(END, f"\n> {cmd}\n", "dim", *squeeze_output(console, output + "\n"))
+        return
+    
+    # Shell commands run on a worker thread and stream their output back,
+    # so the UI stays responsive while they run
+    console.insert(END, f"\n> {cmd}\n", "dim")
+    update_status(mode_status_label, "Running...")
+    state.bash_running = True
+    lines = queue.SimpleQueue()
+    threading.Thread(target=core.stream_command, args=(cmd, state.current_dir, lines.put),
+                     daemon=True).start()
+    console.after(BASH_POLL_MS, drain_bash_output, console, lines, mode_status_label)
+
+def drain_bash_output(console, lines, mode_status_label):
+    """Insert whatever output the bash worker has produced since the last poll"""
+    chunk = []
+    done = False
+    try:
+        while True:
+            line = lines.get_nowait()
+            if line is None:
+                done = True
+                chunk.append("\n")
+                break
+            chunk.append(line)
+    except queue.Empty:
+        pass
+    
+    if chunk:
+        console.insert(END, *squeeze_output(console, "".join(chunk)))
+        trim_console(console)
+        schedule_see(console)
+    if done:
+        state.bash_running = False
+        if state.mode == "bash":
+            update_status(mode_status_label, "Ready")
+    else:
+        console.after(BASH_POLL_MS, drain_bash_output, console, lines, mode_status_label)
+
+def run_chat(core, cmd, console, mode_status_label, entry):
+    console.insert(END, f"\n> {cmd}\n", "dim")
+    state.ai_replying.set() # Lock the state
+    # Pass the callback to the handler
+    core.handle_command(cmd, console, mode_status_label, entry, partial(on_ai_reply_complete, console))
+
+def run_console_command(core, cmd, console, mode_status_label, entry):
+    """Notes and music: echo and reply are written together in one insert"""
+    update_status(mode_status_label, "Processing...")
+    chunks = []
+    try:
+        chunks = core.handle_command(cmd) # Reply as alternating (text, tag) chunks
+    finally:
+        # Echo the command even if its handler failed
+        console.insert(END, f"\n> {cmd}\n", "dim", *chunks)
+    update_status(mode_status_label, "Ready")
+
+# Mode name -> runner(core, cmd, console, mode_status_label, entry)
+MODE_RUNNERS = {
+    "bash": run_bash,
+    "chat": run_chat,
+    "notes": run_console_command,
+    "music": run_console_command,
+}
+
+def _theme_reply(theme_name):
+    if not theme_name:
+        return _themes_reply("")
+    if switch_theme(theme_name):
+        return [f"🎨 Switched to {theme_name} theme\n", "accent",
+                "Restart app to see full theme changes\n", "dim"]
+    themes_list = ", ".join(get_available_themes())
+    return [f"❌ Unknown theme. Available: {themes_list}\n", "error"]
+
+def _themes_reply(rest):
+    themes_list = ", ".join(get_available_themes())
+    return [f"{get_theme_info()}\n", "accent",
+            f"Available themes: {themes_list}\n", "dim",
+            "Usage: /theme <name> (restart to apply)\n", "dim"]
+
+# Slash command -> reply(rest of command) returning insert chunks
+SLASH_COMMANDS = {
+    "/theme": _theme_reply,
+    "/themes": _themes_reply,
+}
 
-def on_enter(entry, get_active_console, mode_status_label):
+def on_enter(entry, entry_var, get_active_console, mode_status_label):
     """Dispatches command to the active mode's console."""
-    global history, history_index, current_dir, mode, is_ai_replying
+    mode = state.mode
     
     # For chat mode, check the state lock
-    if mode == "chat" and is_ai_replying:
+    if mode == "chat" and state.ai_replying.is_set():
         # Optionally provide feedback that the AI is busy
         # For now, we just ignore the input
         return
-
-    cmd = entry.get().strip()
+    cmd = entry_var.get().strip()
     if not cmd:
         return
 
@@ -86,133 +235,172 @@ def on_enter(entry, get_active_console, mode_status_label):
         print("Error: No active console found.")
         return
 
-    # Check for theme commands first
-    if cmd.startswith("/theme "):
-        theme_name = cmd.split(maxsplit=1)[1]
-        from themes import switch_theme, get_available_themes
-        if switch_theme(theme_name):
-            console.insert(END, f"\n> {cmd}\n", "dim")
-            console.insert(END, f"🎨 Switched to {theme_name} theme\n", "accent")
-            console.insert(END, "Restart app to see full theme changes\n", "dim")
-        else:
-            console.insert(END, f"\n> {cmd}\n", "dim")
-            themes_list = ", ".join(get_available_themes())
-            console.insert(END, f"❌ Unknown theme. Available: {themes_list}\n", "error")
-        console.see(END)
-        entry.delete(0, END)
+    if mode == "bash" and state.bash_running:
+        # Output of the previous command is still streaming in; keep the entry
+        console.insert(END, "(command still running)\n", "dim")
+        schedule_see(console)
         return
-    
-    if cmd == "/themes":
-        console.insert(END, f"\n> {cmd}\n", "dim")
-        from themes import get_available_themes, get_theme_info
-        console.insert(END, f"{get_theme_info()}\n", "accent")
-        themes_list = ", ".join(get_available_themes())
-        console.insert(END, f"Available themes: {themes_list}\n", "dim")
-        console.insert(END, "Usage: /theme <name> (restart to apply)\n", "dim")
-        console.see(END)
-        entry.delete(0, END)
+
+    # App-level slash commands (theme switching) work in every mode. Most
+    # commands don't start with '/', so check one character before splitting
+    slash_reply = None
+    if cmd[0] == "/":
+        verb, _, rest = cmd.partition(" ")
+        slash_reply = SLASH_COMMANDS.get(verb)
+    if slash_reply:
+        # Tk's insert takes alternating (text, tags) pairs, so each reply is one Tcl call
+        console.insert(END, f"\n> {cmd}\n", "dim", *slash_reply(rest.strip()))
+        schedule_see(console)
+        entry_var.set("")
         return
 
-    history.append(cmd)
-    history_index = len(history)
+    history = state.history
+    if not history or history[-1] != cmd: # Skip repeats of the last command
+        history.append(cmd)
+    state.history_index = len(history)
     
-    console.insert(END, f"\n> {cmd}\n", "dim")
+    core = get_mode_core(mode)
+    if core is None:
+        console.insert(END,
+                       f"\n> {cmd}\n", "dim",
+                       f"❌ {mode} mode unavailable (missing dependencies)\n", "error")
+
+    else:
+        MODE_RUNNERS[mode](core, cmd, console, mode_status_label, entry)
+
+    trim_console(console)
+    schedule_see(console)
+    entry_var.set("")
+
+def trim_console(console):
+    """Once past MAX_LINES, drop the oldest lines back down to TRIM_TO_LINES"""
+    # Running count kept by ConsoleText on insert, so no Tk query per command
+    line_count = console.line_count
+    if line_count > MAX_LINES:
+        console.delete('1.0', f'{line_count - TRIM_TO_LINES + 1}.0')
+        # Forget truncated lines that were trimmed away with the rest
+        squeezed = squeezed_lines.get(console, {})
+        for tag in [tag for tag in squeezed if not console.tag_ranges(tag)]:
+            del squeezed[tag]
+            console.tag_delete(tag)
+
+def squeeze_output(console, output):
+    """Return insert chunks for output, truncating overly long lines.
+    Clicking a truncated line expands it back to the full text."""
+    if len(output) <= MAX_OUTPUT_LINE:
+        return [output, ""]
     
-    if mode == "bash":
-        update_status(mode_status_label, "Running...")
-        output, new_dir = bash_core.handle_command(cmd, current_dir)
-        current_dir = new_dir
-        console.insert(END, output + "\n")
-        update_status(mode_status_label, "Ready")
-        
-    elif mode == "chat":
-        is_ai_replying = True # Lock the state
-        # Pass the callback to the handler
-        chat_core.handle_command(cmd, console, mode_status_label, entry, on_ai_reply_complete)
-            
-    elif mode == "notes":
-        update_status(mode_status_label, "Processing...")
-        notes_core.handle_command(cmd, console)
-        update_status(mode_status_label, "Ready")
-        
-    elif mode == "music":
-        update_status(mode_status_label, "Processing...")
-        music_core.handle_command(cmd, console)
-        update_status(mode_status_label, "Ready")
+    chunks = []
+    plain = []
+    for line in output.splitlines(keepends=True):
+        if len(line) <= MAX_OUTPUT_LINE:
+            plain.append(line)
+            continue
+        if plain:
+            chunks += ["".join(plain), ""]
+            plain = []
+        tag = f"squeezed{next(_squeeze_ids)}"
+        squeezed = squeezed_lines.get(console)
+        if squeezed is None:
+            # One click binding per console on the shared tag, rather than a
+            # Tcl command per line that tag_delete would never release
+            squeezed = squeezed_lines[console] = {}
+            console.tag_bind("squeezed", "<Button-1>", on_squeezed_click)
+        squeezed[tag] = line
+        chunks += [line[:MAX_OUTPUT_LINE], ("squeezed", tag),
+                   f" … [+{len(line) - MAX_OUTPUT_LINE} chars, click to expand]\n", ("dim", "squeezed", tag)]
+    if plain:
+        chunks += ["".join(plain), ""]
+    return chunks
+
+def on_squeezed_click(event):
+    """Expand whichever truncated line was clicked"""
+    console = event.widget
+    squeezed = squeezed_lines.get(console, {})
+    for tag in console.tag_names("current"):
+        if tag in squeezed:
+            expand_squeezed(console, tag)
+            return
 
-    console.see(END)
-    entry.delete(0, END)
+def expand_squeezed(console, tag):
+    """Replace a truncated output line with its full text"""
+    full = squeezed_lines.get(console, {}).pop(tag, None)
+    ranges = console.tag_ranges(tag)
+    if full is None or not ranges:
+        return
+    start = ranges[0]
+    console.delete(start, ranges[-1])
+    console.insert(start, full)
+    console.tag_delete(tag)
 
 def display_notes(console):
     """Clean notes display - theme-agnostic"""
+    notes_core = get_mode_core("notes")
+    if notes_core.VERSION == state.notes_version:
+        return # Notes unchanged since the last render
     console.delete('1.0', END) # Clear previous content
-    notes = notes_core.get_notes()
-    if not notes:
-        console.insert(END, "  (no tasks yet)\n", "dim")
-        return
-        
-    for i, note in enumerate(notes, 1):
-        console.insert(END, f"  {i}. {note}\n")
-    
-    console.insert(END, f"\nTotal: {len(notes)} task{'s' if len(notes) != 1 else ''}\n", "dim")
+    console.insert(END, *notes_core.notes_chunks())
+    state.notes_version = notes_core.VERSION
 
 def display_music_status(console):
     """Display music player status"""
     console.delete('1.0', END) # Clear previous content
+    music_core = get_mode_core("music")
+    if music_core is None:
+        console.insert(END,
+                       "Music Player (dependencies missing)\n", "warning",
+                       "Check the console for the import error\n", "dim")
+        return
     try:
-        from modes.music.audio_engine import get_audio_engine
-        from modes.music.playlist import get_playlist_manager
-        
-        audio_engine = get_audio_engine()
-        playlist_manager = get_playlist_manager()
+        audio_engine = music_core.get_audio_engine()
+        playlist_manager = music_core.get_playlist_manager()
         
         if not audio_engine.is_available():
-            console.insert(END, "🎵 Music Player (pygame required)\n", "warning")
-            console.insert(END, "  Install: pip install pygame\n", "dim")
+            console.insert(END,
+                           "🎵 Music Player (pygame required)\n", "warning",
+                           "  Install: pip install pygame\n", "dim")
             return
         
         # Show quick status
-        state = audio_engine.get_state()
+        playback_state = audio_engine.get_state()
         current_track = playlist_manager.get_current_track()
         playlist_info = playlist_manager.get_playlist_info()
         
-        console.insert(END, ">> Music Player Ready\n", "accent")
-        
+        # Everything below the title is dim, so build it as one string
+        lines = []
         if current_track:
-            console.insert(END, f"Current: {current_track.title}\n", "dim")
-            console.insert(END, f"Status: {state.value.title()}\n", "dim")
+            lines.append(f"Current: {current_track.title}\n")
+            lines.append(f"Status: {playback_state.value.title()}\n")
         
         track_count = playlist_info['total_tracks']
         if track_count > 0:
-            console.insert(END, f"Playlist: {track_count} track{'s' if track_count != 1 else ''}\n", "dim")
+            lines.append(f"Playlist: {track_count} track{'s' if track_count != 1 else ''}\n")
         else:
-            console.insert(END, "Playlist empty - use 'add ~/Music'\n", "dim")
+            lines.append("Playlist empty - use 'add ~/Music'\n")
             
-        console.insert(END, "\nType 'help' for commands\n", "dim")
+        lines.append("\nType 'help' for commands\n")
+        console.insert(END, ">> Music Player Ready\n", "accent", "".join(lines), "dim")
         
-    except ImportError as e:
-        console.insert(END, "Music Player (dependencies missing)\n", "warning")
-        console.insert(END, f"Error: {str(e)}\n", "dim")
     except Exception as e:
-        console.insert(END, "Music Player (initialization error)\n", "error")
-        console.insert(END, f"Error: {str(e)}\n", "dim")
-
-def on_up(entry):
-    global history_index
-    if history and history_index > 0:
-        history_index -= 1
-        entry.delete(0, END)
-        entry.insert(0, history[history_index])
+        console.insert(END,
+                       "Music Player (initialization error)\n", "error",
+                       f"Error: {str(e)}\n", "dim")
+
+def on_up(entry, entry_var):
+    if state.history and state.history_index > 0:
+        state.history_index -= 1
+        entry_var.set(state.history[state.history_index]) # One Tcl set replaces the whole buffer
+        entry.icursor(END)
     return "break"
 
-def on_down(entry):
-    global history_index
+def on_down(entry, entry_var):
+    history = state.history
     if history:
-        if history_index < len(history) - 1:
-            history_index += 1
-            entry.delete(0, END)
-            entry.insert(0, history[history_index])
+        if state.history_index < len(history) - 1:
+            state.history_index += 1
+            entry_var.set(history[state.history_index])
+            entry.icursor(END)
         else:
-            history_index = len(history)
-            entry.delete(0, END)
+            state.history_index = len(history)
+            entry_var.set("")
     return "break"
@@ -1,30 +1,43 @@
 import subprocess
 import os
+import io
+import codecs
+import locale
 import platform
 import shlex
+import shutil
+import signal
+import threading
+from functools import lru_cache
 
 # List of known TUI applications that need a real terminal
-INTERACTIVE_COMMANDS = {
+INTERACTIVE_COMMANDS = frozenset({
     'nvim', 'vim', 'vi', 'nano', 'emacs', 'pico',
     'nmtui', 'htop', 'top', 'less', 'more', 'man',
     'ssh', 'mosh', 'tmux', 'screen', 'ranger', 'mc'
-}
+})
+
+HOME = os.path.expanduser("~")
+COMMAND_TIMEOUT = 60 # Seconds before a running command is killed
+READ_SIZE = 65536 # Bytes read from a running command's output at a time
+# Characters that need /bin/sh to interpret; commands without any are exec'd directly
+SHELL_METACHARS = frozenset('|&;<>$`(){}*?[]~!#\n')
+
+SYSTEM = platform.system()
+# First common Linux terminal emulator on PATH, looked up once instead of
+# trying to spawn each one in turn on every interactive command
+LINUX_TERMINAL = next((t for t in ('gnome-terminal', 'konsole', 'xfce4-terminal', 'terminator', 'xterm')
+                       if shutil.which(t)), None) if SYSTEM == "Linux" else None
 
 def open_in_new_terminal(command):
     """Opens a command in a new terminal window, OS-compatibly."""
-    system = platform.system()
+    system = SYSTEM
     try:
         if system == "Linux":
-            # Try common terminal emulators on Linux
-            terminals = ['gnome-terminal', 'konsole', 'xfce4-terminal', 'terminator', 'xterm']
-            for terminal in terminals:
-                try:
-                    # Use -- to ensure arguments are passed to the command, not the terminal
-                    subprocess.Popen([terminal, '-e', f"bash -c '{command}; exec bash'"])
-                    return f"✅ Opened '{command}' in a new {terminal} window."
-                except FileNotFoundError:
-                    continue
-            return "⚠️ Could not find a known terminal emulator to open the command."
+            if LINUX_TERMINAL is None:
+                return "⚠️ Could not find a known terminal emulator to open the command."
+            subprocess.Popen([LINUX_TERMINAL, '-e', f"bash -c '{command}; exec bash'"])
+            return f"✅ Opened '{command}' in a new {LINUX_TERMINAL} window."
         elif system == "Windows":
             subprocess.Popen(f'start cmd /c "{command}"', shell=True)
             return f"✅ Opened '{command}' in a new Command Prompt window."
@@ -38,6 +51,21 @@ def open_in_new_terminal(command):
     except Exception as e:
         return f"⚠️ Failed to open new terminal: {str(e)}"
 
+def split_command(cmd):
+    """Split a command line into argv; raises ValueError on unmatched quotes"""
+    # Use shlex to safely parse the command, but only when quoting or escapes
+    # are present; a plain str.split gives the same parts otherwise
+    if '"' in cmd or "'" in cmd or "\\" in cmd:
+        return shlex.split(cmd)
+    return cmd.split()
+
+@lru_cache(maxsize=128)
+def resolve_dir(current_dir, path):
+    """Absolute target of 'cd path' from current_dir (pure string work)"""
+    # current_dir is always absolute, so the join is too and only needs
+    # normalising; abspath would also consult the process cwd for relative input
+    return os.path.normpath(os.path.join(current_dir, os.path.expanduser(path)))
+
 def handle_command(cmd, current_dir):
     """Handles bash commands by detecting their type."""
     cmd = cmd.strip()
@@ -45,10 +73,11 @@ def handle_command(cmd, current_dir):
         return "", current_dir
 
     # 1. Handle 'cd' command separately as it's a shell builtin
-    if cmd.startswith("cd"):
+    verb, _, path = cmd.partition(" ")
+    if verb == "cd":
         try:
-            path = cmd.split(maxsplit=1)[1] if len(cmd.split()) > 1 else os.path.expanduser("~")
-            new_dir = os.path.abspath(os.path.join(current_dir, path))
+            new_dir = resolve_dir(current_dir, path.strip() or HOME)
+            # Existence is checked live; only the path arithmetic is cached
             if os.path.isdir(new_dir):
                 return f"Changed directory to {new_dir}", new_dir
             else:
@@ -56,9 +85,8 @@ def handle_command(cmd, current_dir):
         except Exception as e:
             return f"⚠️ Error: {str(e)}", current_dir
 
-    # Use shlex to safely parse the command
     try:
-        parts = shlex.split(cmd)
+        parts = split_command(cmd)
         base_command = parts[0]
     except ValueError:
         return "⚠️ Error: Unmatched quotes in command.", current_dir
@@ -77,26 +105,88 @@ def handle_command(cmd, current_dir):
         except Exception as e:
             return f"⚠️ Failed to start background process: {str(e)}", current_dir
 
-    # 4. Handle simple, synchronous commands
+    # 4. Everything else runs through the shell; the caller streams its
+    # output with stream_command on a worker thread
+    return None, current_dir
+
+def stream_command(cmd, current_dir, emit):
+    """Run a shell command, passing its output to emit() in whole-line chunks and then None.
+
+    Blocks until the command exits, so call it from a worker thread.
+    """
+    popen_args = dict(
+        stderr=subprocess.STDOUT,
+        stdout=subprocess.PIPE,
+        cwd=current_dir,
+        bufsize=0,
+        start_new_session=(os.name == "posix") # So a timeout can kill the whole group
+    )
     try:
-        result = subprocess.run(
-            cmd, 
-            shell=True, 
-            stderr=subprocess.STDOUT, 
-            stdout=subprocess.PIPE,
-            text=True, 
-            cwd=current_dir,
-            timeout=60 # Add a timeout to prevent indefinite hangs
-        )
-        output = result.stdout
-        if not output.strip():
-            return "(Command executed with no output)", current_dir
-        return output, current_dir
-    except subprocess.CalledProcessError as e:
-        return e.output, current_dir
-    except subprocess.TimeoutExpired:
-        return "⚠️ Command timed out after 60 seconds.", current_dir
-    except FileNotFoundError:
-        return f"⚠️ Command not found: '{base_command}'", current_dir
+        proc = None
+        # Simple commands (ls, pwd, git status...) skip the extra /bin/sh process.
+        # Shell builtins like export or source aren't executables, so a failed
+        # exec falls back to the shell
+        if SHELL_METACHARS.isdisjoint(cmd):
+            try:
+                proc = subprocess.Popen(split_command(cmd), **popen_args)
+            except (OSError, ValueError):
+                pass
+        if proc is None:
+            proc = subprocess.Popen(cmd, shell=True, **popen_args)
     except Exception as e:
-        return f"⚠️ An unexpected error occurred: {str(e)}", current_dir
+        emit(f"⚠️ An unexpected error occurred: {str(e)}\n")
+        emit(None)
+        return
+
+    timed_out = threading.Event()
+    def kill():
+        timed_out.set()
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except OSError:
+            pass
+    timer = threading.Timer(COMMAND_TIMEOUT, kill) # Prevent indefinite hangs
+    timer.start()
+
+    # Read whatever the pipe holds (up to READ_SIZE) rather than line by line,
+    # so a command printing thousands of lines costs a handful of emits.
+    # Decoding matches text=True: locale encoding, universal newlines.
+    # Binary output is replaced rather than aborting the read
+    decoder = io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace"),
+        translate=True)
+    fd = proc.stdout.fileno()
+    has_output = False
+    # Pieces of a partial last line, held back so the console only gets whole
+    # lines; only new text is searched for newlines, and pieces are joined once
+    pending = []
+    try:
+        while True:
+            data = os.read(fd, READ_SIZE)
+            text = decoder.decode(data, final=not data)
+            cut = text.rfind("\n") + 1 if data else len(text)
+            if cut or (pending and not data):
+                pending.append(text[:cut])
+                chunk = "".join(pending)
+                has_output = has_output or not chunk.isspace()
+                emit(chunk)
+                pending = []
+            if text[cut:]:
+                pending.append(text[cut:])
+            if not data:
+                break
+        proc.wait()
+    except Exception as e:
+        emit(f"⚠️ An unexpected error occurred: {str(e)}\n")
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+
+    if timed_out.is_set():
+        emit(f"⚠️ Command timed out after {COMMAND_TIMEOUT} seconds.\n")
+    elif not has_output:
+        emit("(Command executed with no output)\n")
+    emit(None)
@@ -1,42 +1,88 @@
 import json
+from collections import namedtuple
+from functools import partial
 from tkinter import END
 from . import task_manager, web_search, file_reader, memory_tools, visual_assistant
 from ..utils.api_client import call_mistral_api, call_mistral_vision_api, supports_vision
 from . import bash_executor
 
-# Tool registry - maps tool names to actual functions
-TOOL_REGISTRY = {
+# How a tool is called and announced: adapter turns the parsed JSON arguments
+# into keyword arguments; message is formatted with those arguments and shown
+# before the call if announce_first, otherwise after it succeeds
+ToolSpec = namedtuple("ToolSpec", ["function", "adapter", "message", "tag", "announce_first"],
+                      defaults=(None, "success", False))
+
+def _pass_arguments(arguments):
+    return arguments
+
+def _no_arguments(arguments):
+    return {}
+
+def _adapt_capture(arguments):
+    kwargs = {"save_screenshot": arguments.get("save_screenshot", True)}
+    region = arguments.get("region")
+    if region and len(region) == 4:
+        kwargs["region"] = tuple(region)
+    return kwargs
+
+def _adapt_region(arguments):
+    return {name: arguments.get(name) for name in ("x1", "y1", "x2", "y2")}
+
+class _FeedbackArguments(dict):
+    """Arguments for formatting feedback, always as strings; a missing one shows as empty"""
+    def __getitem__(self, key):
+        return str(super().__getitem__(key))
+
+    def __missing__(self, key):
+        return ""
+
+def _format_feedback(spec, arguments):
+    return spec.message.format_map(_FeedbackArguments(arguments)) + "\n"
+
+# Tool registry - maps tool names to their specs
+TOOL_SPECS = {
     # Existing tools...
-    "add_task_to_notes": task_manager.add_task_to_notes,
-    "search_web": web_search.search_web,
-    "read_file": file_reader.read_file,
-    "list_available_files": file_reader.list_available_files,
-    "remember_fact": memory_tools.remember_fact,
-    "recall_information": memory_tools.recall_information,
-    "update_preference": memory_tools.update_preference,
-    "get_memory_stats": memory_tools.get_memory_stats,
-    "capture_screen_context": visual_assistant.capture_screen_context,
-    "get_screen_dimensions": visual_assistant.get_screen_dimensions,
-    "analyze_screen_region": visual_assistant.analyze_screen_region,
+    "add_task_to_notes": ToolSpec(task_manager.add_task_to_notes, _pass_arguments, "✓ Task added: {task_content:.30}..."),
+    "search_web": ToolSpec(web_search.search_web, _pass_arguments, "Web search: {query:.30}..."),
+    "read_file": ToolSpec(file_reader.read_file, _pass_arguments),
+    "list_available_files": ToolSpec(file_reader.list_available_files, _pass_arguments),
+    "remember_fact": ToolSpec(memory_tools.remember_fact, _pass_arguments, "Fact stored in memory"),
+    "recall_information": ToolSpec(memory_tools.recall_information, _pass_arguments, "Memory searched"),
+    "update_preference": ToolSpec(memory_tools.update_preference, _pass_arguments),
+    "get_memory_stats": ToolSpec(memory_tools.get_memory_stats, _pass_arguments),
+    # Special handling for visual tools
+    "capture_screen_context": ToolSpec(visual_assistant.capture_screen_context, _adapt_capture,
+                                       "  📸 Screen captured for analysis"),
+    "get_screen_dimensions": ToolSpec(visual_assistant.get_screen_dimensions, _no_arguments,
+                                      "  📏 Screen dimensions retrieved"),
+    "analyze_screen_region": ToolSpec(visual_assistant.analyze_screen_region, _adapt_region,
+                                      "  🎯 Region captured for analysis"),
     
     # Add new bash tools
-    "execute_bash_command": bash_executor.execute_bash_command,
-    "get_current_directory": bash_executor.get_current_directory,
-    "change_directory": bash_executor.change_directory,
-    "get_bash_command_history": bash_executor.get_bash_command_history,
+    "execute_bash_command": ToolSpec(bash_executor.execute_bash_command, _pass_arguments,
+                                     "  🖥️  Executing: {command}", "accent", True),
+    "get_current_directory": ToolSpec(bash_executor.get_current_directory, _no_arguments,
+                                      "  📁 Checking current directory"),
+    "change_directory": ToolSpec(bash_executor.change_directory, _pass_arguments,
+                                 "  📂 Changing to: {path}", announce_first=True),
+    "get_bash_command_history": ToolSpec(bash_executor.get_bash_command_history, _pass_arguments,
+                                         "  📚 Retrieving command history", announce_first=True),
 }
 
-def handle_agent_response(response, session_history, console, status_label):
+def handle_agent_response(response, session_history, console, status_label, output_sink=None):
     """
     FIXED: Enhanced agent handler with proper vision integration
+    Output goes to output_sink(text, tag=None), by default appended to console.
     """
+    if output_sink is None:
+        output_sink = partial(console.insert, END)
     # Check if AI decided to use tools
     tool_calls = response.get("tool_calls")
     
     if not tool_calls:
         # Simple response - no autonomous action needed
         content = response.get("content", "I'm not sure how to respond.")
-        console.insert(END, f"{content}\n")
+        output_sink(f"{content}\n")
         return
     
     # Track if we captured any visual content and store the image data
@@ -46,7 +92,7 @@ def handle_agent_response(response, session_history, console, status_label):
     
     # Execute all tool calls the AI requested
     for tool_call in tool_calls:
-        tool_result = execute_autonomous_tool(tool_call, console)
+        tool_result = execute_autonomous_tool(tool_call, console, output_sink)
         tool_results.append(tool_result)
         # Add tool result to session history
         session_history.append(tool_result)
@@ -63,11 +109,11 @@ def handle_agent_response(response, session_history, console, status_label):
                 if cached_screenshot:
                     captured_image_data = cached_screenshot
             except Exception as e:
-                console.insert(END, f"⚠️ Failed to get screenshot data: {str(e)}\n", "warning")
+                output_sink(f"⚠️ Failed to get screenshot data: {str(e)}\n", "warning")
     
     # FIXED: Now get AI's final response with proper vision integration
     if visual_tool_used and captured_image_data and supports_vision():
-        console.insert(END, "Analyzing visual content with Mistral Vision...\n", "dim")
+        output_sink("Analyzing visual content with Mistral Vision...\n", "dim")
         
         try:
             # FIXED: Use vision API directly with the captured screenshot
@@ -86,15 +132,15 @@ def handle_agent_response(response, session_history, console, status_label):
             }
             
             session_history.append(unified_response)
-            console.insert(END, "✅ Visual analysis complete!\n", "success")
+            output_sink("✅ Visual analysis complete!\n", "success")
             
             # Display the unified response
             final_content = unified_response.get("content")
-            console.insert(END, f"{final_content}\n")
+            output_sink(f"{final_content}\n")
             
         except Exception as e:
-            console.insert(END, f"⚠️ Vision analysis failed: {str(e)}\n", "warning")
-            console.insert(END, "💬 Providing response based on tool results...\n", "dim")
+            output_sink(f"⚠️ Vision analysis failed: {str(e)}\n", "warning")
+            output_sink("💬 Providing response based on tool results...\n", "dim")
             
             # FIXED: Fallback that still acknowledges the screenshot was taken
             fallback_content = "I captured your screen successfully, but couldn't perform detailed visual analysis due to an API issue. However, I can still help you with the information available. What would you like to know about your screen content?"
@@ -104,13 +150,13 @@ def handle_agent_response(response, session_history, console, status_label):
                 "content": fallback_content
             }
             session_history.append(fallback_response)
-            console.insert(END, f"{fallback_content}\n")
+            output_sink(f"{fallback_content}\n")
     else:
         # FIXED: For non-visual tools, create a response that acknowledges what was done
         if visual_tool_used and not supports_vision():
-            console.insert(END, "⚠️ Vision not available with current model, providing text response...\n", "warning")
+            output_sink("⚠️ Vision not available with current model, providing text response...\n", "warning")
         
-        #console.insert(END, "💬 Agent formulating response based on tool results...\n", "dim")
+        #output_sink("💬 Agent formulating response based on tool results...\n", "dim")
         
         # Create context for the text model that includes what tools were executed
         tool_summary = []
@@ -134,18 +180,20 @@ def handle_agent_response(response, session_history, console, status_label):
         session_history.append(final_response)
         
         final_content = final_response.get("content", "I've completed the requested actions.")
-        console.insert(END, f"{final_content}\n")
+        output_sink(f"{final_content}\n")
 
-def execute_autonomous_tool(tool_call, console):
+def execute_autonomous_tool(tool_call, console, output_sink=None):
     """
     Execute a tool that the AI autonomously decided to use.
     Enhanced with better visual tool feedback.
     """
+    if output_sink is None:
+        output_sink = partial(console.insert, END)
     tool_id = tool_call.get("id")
     function_info = tool_call.get("function", {})
     tool_name = function_info.get("name")
     
-    #console.insert(END, f"Mini is executing: {tool_name}\n", "dim")
+    #output_sink(f"Mini is executing: {tool_name}\n", "dim")
     
     tool_result = {
         "role": "tool",
@@ -154,69 +202,24 @@ def execute_autonomous_tool(tool_call, console):
         "content": ""
     }
     
-    if tool_name in TOOL_REGISTRY:
+    spec = TOOL_SPECS.get(tool_name)
+    if spec:
         try:
             # Parse arguments and execute tool autonomously
             arguments = json.loads(function_info.get("arguments", "{}"))
-            tool_function = TOOL_REGISTRY[tool_name]
-            if tool_name == "execute_bash_command":
-                command = arguments.get("command", "")
-                console.insert(END, f"  🖥️  Executing: {command}\n", "accent")
-                result = tool_function(**arguments)
-                
-            elif tool_name == "get_current_directory":
-                result = tool_function()
-                console.insert(END, f"  📁 Checking current directory\n", "success")
-                
-            elif tool_name == "change_directory":
-                path = arguments.get("path", "")
-                console.insert(END, f"  📂 Changing to: {path}\n", "success")
-                result = tool_function(**arguments)
-                
-            elif tool_name == "get_bash_command_history":
-                console.insert(END, f"  📚 Retrieving command history\n", "success")
-                result = tool_function(**arguments)
-            # Special handling for visual tools
-            elif tool_name == "capture_screen_context":
-                region = arguments.get("region")
-                if region and len(region) == 4:
-                    result = tool_function(region=tuple(region), save_screenshot=arguments.get("save_screenshot", True))
-                else:
-                    result = tool_function(save_screenshot=arguments.get("save_screenshot", True))
-                console.insert(END, f"  📸 Screen captured for analysis\n", "success")
-                
-            elif tool_name == "analyze_screen_region":
-                result = tool_function(
-                    arguments.get("x1"), arguments.get("y1"),
-                    arguments.get("x2"), arguments.get("y2")
-                )
-                console.insert(END, f"  🎯 Region captured for analysis\n", "success")
-                
-            elif tool_name == "get_screen_dimensions":
-                result = tool_function()
-                console.insert(END, f"  📏 Screen dimensions retrieved\n", "success")
-                
-            else:
-                # Regular tool execution
-                result = tool_function(**arguments)
-                
-                # Show appropriate feedback
-                if tool_name == "add_task_to_notes":
-                    console.insert(END, f"✓ Task added: {arguments.get('task_content', '')[:30]}...\n", "success")
-                elif tool_name == "search_web":
-                    console.insert(END, f"Web search: {arguments.get('query', '')[:30]}...\n", "success")
-                elif tool_name == "remember_fact":
-                    console.insert(END, f"Fact stored in memory\n", "success")
-                elif tool_name == "recall_information":
-                    console.insert(END, f"Memory searched\n", "success")
+            if spec.message and spec.announce_first:
+                output_sink(_format_feedback(spec, arguments), spec.tag)
+            result = spec.function(**spec.adapter(arguments))
+            if spec.message and not spec.announce_first:
+                output_sink(_format_feedback(spec, arguments), spec.tag)
             
             tool_result["content"] = str(result)
             
         except Exception as e:
-            console.insert(END, f"  ❌ Tool error: {str(e)}\n", "error")
+            output_sink(f"  ❌ Tool error: {str(e)}\n", "error")
             tool_result["content"] = f"Error: {str(e)}"
     else:
-        console.insert(END, f"  ❌ Unknown tool: {tool_name}\n", "error")
+        output_sink(f"  ❌ Unknown tool: {tool_name}\n", "error")
         tool_result["content"] = f"Error: Tool '{tool_name}' not available."
     
     return tool_result
\ No newline at end of file
@@ -11,6 +11,7 @@ import re
 import queue
 from concurrent.futures import ThreadPoolExecutor
 
+from themes import get_current_theme_key
 from config import CHAT_HISTORY_DIR, CHAT_HISTORY_LENGTH, MEMORY_DIR
 from .utils.api_client import call_mistral_api
 from .capabilities.agent import handle_agent_response
@@ -28,6 +29,8 @@ except ImportError:
 
 # Global memory manager - this replaces simple session history!
 _memory_manager = None
+# Global response display - one per chat console, so only one GUI queue poller runs
+_response_display = None
 
 def get_memory_manager():
     """Get or create the memory manager instance"""
@@ -37,6 +40,16 @@ def get_memory_manager():
         _memory_manager = MemoryManager(memory_dir, call_mistral_api)
     return _memory_manager
 
+def get_response_display(console, status_label):
+    """Get or create the async response display for the chat console"""
+    global _response_display
+    if _response_display is None or _response_display.console is not console:
+        _response_display = AsyncSmoothResponseDisplay(console, status_label)
+    elif _response_display.theme_key != get_current_theme_key():
+        # Theme switched since the tags were set; recolour headings and code
+        _response_display._setup_markdown_tags()
+    return _response_display
+
 def load_history():
     """Returns enhanced history with long-term memory context"""
     memory_manager = get_memory_manager()
@@ -102,8 +115,8 @@ def handle_command(cmd, console, status_label, entry, on_complete_callback=None)
     """Enhanced chat handler with async smooth response display and completion callback."""
     memory_manager = get_memory_manager()
     
-    # Create async response display handler
-    response_display = AsyncSmoothResponseDisplay(console, status_label)
+    # Shared async response display handler
+    response_display = get_response_display(console, status_label)
     
     def command_complete():
         """Function to call when any command is done."""
@@ -112,7 +125,7 @@ def handle_command(cmd, console, status_label, entry, on_complete_callback=None)
 
     # Memory-specific commands (these are synchronous and finish immediately)
     if cmd.lower().startswith(("/search", "/find", "/remember")):
-        query = cmd.split(maxsplit=1)[1] if len(cmd.split()) > 1 else ""
+        query = cmd.partition(" ")[2].strip()
         if not query:
             console.insert(END, "Usage: /search <query>\n", "warning")
             command_complete()
@@ -172,18 +185,19 @@ def handle_command(cmd, console, status_label, entry, on_complete_callback=None)
     # Regular chat processing with async animations
     response_display.show_thinking_dots()
     console.update_idletasks()
-    
-    # Get enhanced history
-    history = load_history()
-    
-    # Add user message
-    user_message = {"role": "user", "content": cmd}
-    history.append(user_message)
-    add_to_session_history(user_message)
 
     def process_in_background():
         """Process API call in background thread with proper error handling"""
         try:
+            # History assembly can hit disk, and adding the user message may
+            # auto-compress memory (more API calls), so keep it off the Tk thread
+            history = load_history()
+            
+            # Add user message
+            user_message = {"role": "user", "content": cmd}
+            history.append(user_message)
+            add_to_session_history(user_message)
+            
             # Get response from API
             response = call_mistral_api(history)
             
@@ -2,7 +2,7 @@
 import requests
 import time
 import threading  
-from config import MISTRAL_API_KEY, MISTRAL_URL, get_text_model, get_vision_model
+from config import MISTRAL_API_KEY, MISTRAL_URL, get_text_model, get_vision_model, supports_vision
 from ..prompts.composer import get_system_prompt  # Updated import
 from ..prompts.tools import get_mistral_tools      # Updated import
 
@@ -200,14 +200,6 @@ def call_mistral_vision_api(history, image_base64, min_interval=3.0):
         "content": "The vision request failed after multiple retries. Please try again later."
     }
 
-def supports_vision():
-    """Check if vision is available"""
-    try:
-        from config import supports_vision as config_supports_vision
-        return config_supports_vision()
-    except ImportError:
-        return False
-
 # Debug function to check rate limiting
 def debug_rate_limiting():
     """Debug function to check rate limiter state"""
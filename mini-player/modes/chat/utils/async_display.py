@@ -1,11 +1,68 @@
 import asyncio
+import itertools
+import random
 import threading
 import queue
 import time
 import re
-import tkinter as tk
 from tkinter import END
-from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from themes import get_current_theme, get_current_theme_key
+except ImportError:
+    get_current_theme = get_current_theme_key = None
+
+# Fallback theme
+_FALLBACK_THEME = {
+    "accent": "#00ff88",
+    "text": "#ffffff", 
+    "border": "#333333",
+    "dim": "#888888"
+}
+
+# Markdown tag -> (fixed options, {option: theme colour key})
+_MARKDOWN_TAG_SPECS = (
+    # Headers
+    ("h1", {"font": ("JetBrains Mono", 14, "bold")}, {"foreground": "accent"}),
+    ("h2", {"font": ("JetBrains Mono", 12, "bold")}, {"foreground": "accent"}),
+    ("h3", {"font": ("JetBrains Mono", 11, "bold")}, {"foreground": "text"}),
+    # Text formatting
+    ("bold", {"font": ("Cascadia Code", 10, "bold")}, {}),
+    ("italic", {"font": ("Cascadia Code", 10, "italic")}, {}),
+    ("code_inline", {"font": ("Cascadia Code", 9)}, {"background": "border", "foreground": "accent"}),
+    # Code blocks
+    ("code_block",
+     {"font": ("Cascadia Code", 9), "lmargin1": 20, "lmargin2": 20, "rmargin": 20, "spacing1": 5, "spacing3": 5},
+     {"background": "border", "foreground": "text"}),
+)
+
+# Words plus their trailing whitespace; the typewriter inserts one word at a time
+_WORD_RE = re.compile(r'\S+\s*|\s+')
+
+# Any of: header, code fence, bold, inline code, list item, quote
+_MARKDOWN_RE = re.compile(r'^#+\s|```|\*\*.*?\*\*|`[^`]+`|^\s*[-*+]\s|^>', re.MULTILINE)
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_LIST_ITEM_RE = re.compile(r'^\s*[-*+]\s')
+# Bold, italic or inline code; the tag comes from whichever group matched
+_INLINE_RE = re.compile(r'\*\*([^*]+)\*\*|\*([^*]+)\*|`([^`]+)`')
+_INLINE_TAGS = (None, 'bold', 'italic', 'code_inline')  # Indexed by match.lastindex
+
+# Typewriter pacing (ms): punctuation and spaces have fixed delays, other
+# characters get BASE_CHAR_DELAY plus jitter from a table drawn once at import
+BASE_CHAR_DELAY = 20
+_CHAR_DELAYS = {
+    **dict.fromkeys('.!?', BASE_CHAR_DELAY * 4),
+    **dict.fromkeys(',;:', BASE_CHAR_DELAY * 2),
+    '\n': BASE_CHAR_DELAY * 3,
+    ' ': BASE_CHAR_DELAY * 0.8,
+}
+_JITTER = itertools.cycle([random.randint(-5, 8) for _ in range(4096)])
+
+GUI_POLL_MS = 50  # How often queued display updates are applied to Tk
+GUI_BATCH_LIMIT = 500  # Most queued updates applied in one tick, so a flood can't stall Tk
+GUI_QUEUE_LIMIT = 1000  # Worker threads wait for Tk to catch up past this many pending updates
+# Seconds between frames of each status animation
+ANIMATION_INTERVALS = {"thinking": 0.4, "working": 0.15, "typing": 0.3}
 
 class AsyncSmoothResponseDisplay:
     """Thread-safe smooth response display with proper tkinter threading"""
@@ -17,10 +74,12 @@ class AsyncSmoothResponseDisplay:
         # Animation control
         self.animation_active = False
         self.stop_animation_event = threading.Event()
+        self.animation = None  # (type, message, interval), ticked by the GUI queue processor
+        self._animation_due = 0
         
         # Thread-safe communication queues
         self.gui_queue = queue.Queue()
-        self.animation_queue = queue.Queue()
+        self.tk_thread = threading.current_thread()  # Created from the Tk thread
         
         # Response display control
         self.display_active = False
@@ -28,111 +87,122 @@ class AsyncSmoothResponseDisplay:
         # Scroll state
         self.user_has_scrolled = False
         self.auto_scroll_enabled = True
+        self.console_visible = True  # Refreshed on the Tk thread as inserts are flushed
+        self.view_bottom = 1.0  # Bottom of the visible region as a fraction, pushed by Tk
         
-        # Thread pool for background tasks
-        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mini_display")
+        # One long-lived worker runs display and agent jobs in order; a reply
+        # is shown one at a time anyway, so a pool would only add threads
+        self.work_queue = queue.SimpleQueue()
+        self.worker_thread = threading.Thread(target=self._work_loop, name="mini_display", daemon=True)
+        self.worker_thread.start()
         
         self._setup_scroll_detection()
         self._setup_markdown_tags()
         self._start_gui_queue_processor()
     
+    def _work_loop(self):
+        """Run queued background jobs until shutdown queues None"""
+        while True:
+            job = self.work_queue.get()
+            if job is None:
+                return
+            try:
+                job()
+            except Exception as e:
+                print(f"Display worker error: {e}")
+    
     def _setup_markdown_tags(self):
         """Setup basic markdown text tags"""
-        try:
-            from themes import get_current_theme
-            theme = get_current_theme()
-        except ImportError:
-            # Fallback theme
-            theme = {
-                "accent": "#00ff88",
-                "text": "#ffffff", 
-                "border": "#333333",
-                "dim": "#888888"
-            }
-        
-        # Headers
-        self.console.tag_config("h1", font=("JetBrains Mono", 14, "bold"), foreground=theme["accent"])
-        self.console.tag_config("h2", font=("JetBrains Mono", 12, "bold"), foreground=theme["accent"])
-        self.console.tag_config("h3", font=("JetBrains Mono", 11, "bold"), foreground=theme["text"])
-        
-        # Text formatting
-        self.console.tag_config("bold", font=("Cascadia Code", 10, "bold"))
-        self.console.tag_config("italic", font=("Cascadia Code", 10, "italic"))
-        self.console.tag_config("code_inline", 
-                               font=("Cascadia Code", 9), 
-                               background=theme["border"],
-                               foreground=theme["accent"])
-        
-        # Code blocks
-        self.console.tag_config("code_block", 
-                               font=("Cascadia Code", 9),
-                               background=theme["border"],
-                               foreground=theme["text"],
-                               lmargin1=20, lmargin2=20,
-                               rmargin=20,
-                               spacing1=5, spacing3=5)
-        
-        # Status tags
-        self.console.tag_config("success", foreground="#00ff88")
-        self.console.tag_config("error", foreground="#ff4444")
-        self.console.tag_config("warning", foreground="#ffaa00")
-        self.console.tag_config("accent", foreground=theme["accent"])
-        self.console.tag_config("dim", foreground=theme["dim"])
+        theme = get_current_theme() if get_current_theme else _FALLBACK_THEME
+        self.theme_key = get_current_theme_key() if get_current_theme_key else None
+        for tag, options, colors in _MARKDOWN_TAG_SPECS:
+            self.console.tag_config(tag, **options, **{option: theme[key] for option, key in colors.items()})
+        # Status tags (success, error, ...) are configured by the app for every
+        # theme; setting them here would override its colours with stale ones
     
     def _start_gui_queue_processor(self):
         """Start processing GUI updates from the queue on the main thread"""
         def process_gui_queue():
             try:
-                # Process multiple items at once for better performance
+                # Drain everything queued since the last tick; consecutive inserts
+                # are merged into one multi-chunk console.insert
+                chunks = []
                 items_processed = 0
-                while items_processed < 10:  # Limit to prevent blocking
+                while items_processed < GUI_BATCH_LIMIT:  # Limit to prevent blocking
                     try:
-                        task = self.gui_queue.get_nowait()
-                        task_type, args = task
-                        
-                        if task_type == "insert":
-                            text, tag = args
-                            self.console.insert(END, text, tag or ())
-                            if self._should_auto_scroll():
-                                self.console.see(END)
-                        
-                        elif task_type == "status":
-                            text = args[0]
-                            self.status_label.config(text=text)
-                        
-                        elif task_type == "animation":
-                            animation_type, message = args
-                            self._update_animation_display(animation_type, message)
-                        
-                        elif task_type == "stop_animation":
-                            self._stop_animation_display()
-                        
-                        elif task_type == "complete":
-                            callback = args[0] if args else None
-                            if callback:
-                                callback()
-                        
-                        elif task_type == "stop":
-                            # Shutdown signal
-                            return
-                        
-                        self.gui_queue.task_done()
-                        items_processed += 1
-                        
+                        task_type, args = self.gui_queue.get_nowait()
                     except queue.Empty:
                         break
+                    items_processed += 1
+                    
+                    if task_type == "insert":
+                        text, tag = args
+                        chunks += (text, tag or ())
+                        continue
+                    
+                    if task_type == "insert_many":
+                        chunks += args  # Already alternating (text, tags)
+                        continue
+                    
+                    # Anything else must see the text queued before it
+                    if chunks:
+                        self._flush_inserts(chunks)
+                        chunks = []
+                    
+                    if task_type == "status":
+                        text = args[0]
+                        self.status_label.config(text=text)
+                    
+                    elif task_type == "stop_animation":
+                        self._stop_animation_display()
+                    
+                    elif task_type == "complete":
+                        callback = args[0] if args else None
+                        if callback:
+                            callback()
+                    
+                    elif task_type == "stop":
+                        # Shutdown signal
+                        return
+                
+                if chunks:
+                    self._flush_inserts(chunks)
+                
+                # Advance the status animation when its next frame is due
+                animation = self.animation
+                if animation:
+                    now = time.monotonic()
+                    if now >= self._animation_due:
+                        animation_type, message, interval = animation
+                        # No frames while the window is hidden; nobody would see them
+                        if self.status_label.winfo_viewable():
+                            self._update_animation_display(animation_type, message)
+                        self._animation_due = now + interval
                         
             except Exception as e:
                 print(f"GUI queue processor error: {e}")
             
             # Schedule next check
-            self.console.after(50, process_gui_queue)  # Check every 50ms
+            self.console.after(GUI_POLL_MS, process_gui_queue)
         
         # Start the processor
         self.console.after(10, process_gui_queue)
     
+    def _flush_inserts(self, chunks):
+        """Insert alternating (text, tags) chunks in one Tk call, then scroll once"""
+        self.console.insert(END, *chunks)
+        # Worker threads can't query Tk, so note here whether the chat console is showing
+        self.console_visible = bool(self.console.winfo_viewable())
+        if self._should_auto_scroll():
+            self.console.see(END)
+    
     def _queue_gui_update(self, task_type, args):
         """Thread-safe way to queue GUI updates"""
+        # Back-pressure for worker threads so a fast producer can't grow the
+        # queue without bound; the Tk thread drains it, so it must never wait
+        while (self.gui_queue.qsize() > GUI_QUEUE_LIMIT
+               and threading.current_thread() is not self.tk_thread):
+            time.sleep(GUI_POLL_MS / 1000.0)
         self.gui_queue.put((task_type, args))
     
     def _safe_console_insert(self, text, tag=None):
@@ -143,10 +213,6 @@ class AsyncSmoothResponseDisplay:
         """Thread-safe status label update"""
         self._queue_gui_update("status", (text,))
     
-    def _safe_animation_update(self, animation_type, message):
-        """Thread-safe animation update"""
-        self._queue_gui_update("animation", (animation_type, message))
-    
     def _safe_complete_callback(self, callback):
         """Thread-safe callback execution"""
         if callback:
@@ -182,63 +248,35 @@ class AsyncSmoothResponseDisplay:
         self._working_chars = 0
         self._typing_states = 0
     
-    def show_thinking_dots(self, base_message="Mini thinking"):
-        """Start async thinking dots animation"""
+    def _start_animation(self, animation_type, message):
+        """Start a status animation; frames are drawn by the GUI queue processor"""
         self.stop_animation()
         self.animation_active = True
         self.stop_animation_event.clear()
-        
-        def animate_thinking():
-            while not self.stop_animation_event.is_set():
-                self._safe_animation_update("thinking", base_message)
-                if self.stop_animation_event.wait(0.4):
-                    break
-        
-        self.animation_thread = threading.Thread(target=animate_thinking, daemon=True)
-        self.animation_thread.start()
+        # Swapping one tuple is all a state change costs - no thread per animation
+        self._animation_due = 0
+        self.animation = (animation_type, message, ANIMATION_INTERVALS[animation_type])
         return self
     
+    def show_thinking_dots(self, base_message="Mini thinking"):
+        """Start async thinking dots animation"""
+        return self._start_animation("thinking", base_message)
+    
     def show_working(self, message="Mini working"):
         """Start async working spinner animation"""
-        self.stop_animation()
-        self.animation_active = True
-        self.stop_animation_event.clear()
-        
-        def animate_working():
-            while not self.stop_animation_event.is_set():
-                self._safe_animation_update("working", message)
-                if self.stop_animation_event.wait(0.15):
-                    break
-        
-        self.animation_thread = threading.Thread(target=animate_working, daemon=True)
-        self.animation_thread.start()
-        return self
+        return self._start_animation("working", message)
     
     def show_typing(self, message="Mini typing"):
         """Start async typing indicator animation"""
-        self.stop_animation()
-        self.animation_active = True
-        self.stop_animation_event.clear()
-        
-        def animate_typing():
-            while not self.stop_animation_event.is_set():
-                self._safe_animation_update("typing", message)
-                if self.stop_animation_event.wait(0.3):
-                    break
-        
-        self.animation_thread = threading.Thread(target=animate_typing, daemon=True)
-        self.animation_thread.start()
-        return self
+        return self._start_animation("typing", message)
     
     def stop_animation(self):
         """Stop current animation"""
         if self.animation_active:
             self.animation_active = False
+            self.animation = None
             self.stop_animation_event.set()
             self._queue_gui_update("stop_animation", ())
-            
-            if hasattr(self, 'animation_thread') and self.animation_thread and self.animation_thread.is_alive():
-                self.animation_thread.join(timeout=0.5)
     
     def display_response_naturally(self, response_text, prefix="Mini: ", on_complete_callback=None):
         """Display response with non-blocking animations and a completion callback."""
@@ -277,23 +315,12 @@ class AsyncSmoothResponseDisplay:
                 self._safe_status_update("Ready")
                 self._safe_complete_callback(on_complete_callback)
         
-        self.executor.submit(execute_display)
+        self.work_queue.put(execute_display)
     
     def _has_markdown_formatting(self, text):
         """Quick check for common markdown patterns"""
-        markdown_indicators = [
-            r'^#+\s',           # Headers
-            r'```',             # Code blocks
-            r'\*\*.*?\*\*',     # Bold
-            r'`[^`]+`',         # Inline code
-            r'^\s*[-*+]\s',     # Lists
-            r'^\>',             # Quotes
-        ]
-        
-        for pattern in markdown_indicators:
-            if re.search(pattern, text, re.MULTILINE):
-                return True
-        return False
+        # One scan with the combined pattern instead of one per indicator
+        return _MARKDOWN_RE.search(text) is not None
     
     def _execute_markdown_display(self, text):
         """Execute markdown display in background"""
@@ -325,7 +352,7 @@ class AsyncSmoothResponseDisplay:
             self._insert_line_with_formatting_async(line + '\n')
             
             # Small delay between lines for natural flow
-            time.sleep(0.05)
+            self._typing_pause(0.05)
         
         # Handle remaining code block
         if code_lines:
@@ -347,7 +374,7 @@ class AsyncSmoothResponseDisplay:
         elif line.startswith('> '):
             self._safe_console_insert(line[2:], "quote")
             return
-        elif re.match(r'^\s*[-*+]\s', line):
+        elif _LIST_ITEM_RE.match(line):
             self._safe_console_insert(line, "list_item")
             return
         
@@ -356,38 +383,18 @@ class AsyncSmoothResponseDisplay:
     
     def _insert_with_inline_formatting_async(self, text):
         """Insert text with inline formatting (async-safe)"""
-        remaining = text
-        
-        while remaining:
-            if self.stop_animation_event.is_set():
-                break
-                
-            patterns = [
-                (r'\*\*([^*]+)\*\*', 'bold'),
-                (r'\*([^*]+)\*', 'italic'),
-                (r'`([^`]+)`', 'code_inline'),
-            ]
-            
-            earliest_match = None
-            earliest_pos = len(remaining)
-            
-            for pattern, tag in patterns:
-                match = re.search(pattern, remaining)
-                if match and match.start() < earliest_pos:
-                    earliest_pos = match.start()
-                    earliest_match = (match, tag)
-            
-            if earliest_match:
-                match, tag = earliest_match
-                
-                if match.start() > 0:
-                    self._safe_console_insert(remaining[:match.start()])
-                
-                self._safe_console_insert(match.group(1), tag)
-                remaining = remaining[match.end():]
-            else:
-                self._safe_console_insert(remaining)
-                break
+        # One pass over the line, queued as a single multi-chunk insert
+        chunks = []
+        last_end = 0
+        for match in _INLINE_RE.finditer(text):
+            if match.start() > last_end:
+                chunks += (text[last_end:match.start()], ())
+            chunks += (match.group(match.lastindex), _INLINE_TAGS[match.lastindex])
+            last_end = match.end()
+        if last_end < len(text):
+            chunks += (text[last_end:], ())
+        if chunks:
+            self._queue_gui_update("insert_many", chunks)
     
     def _execute_typewriter_effect(self, text):
         """Execute typewriter effect in background"""
@@ -399,24 +406,34 @@ class AsyncSmoothResponseDisplay:
                 
             if chunk == '\n':
                 self._safe_console_insert('\n\n')
-                time.sleep(0.3)
+                self._typing_pause(0.3)
                 continue
             
-            # Type character by character
-            for char in chunk:
+            # Type word by word: one insert per word, paced by the summed
+            # per-character delays, instead of a queued insert per character
+            for word in _WORD_RE.findall(chunk):
                 if self.stop_animation_event.is_set():
                     break
                     
-                self._safe_console_insert(char)
+                self._safe_console_insert(word)
                 
-                # Variable delay based on character
-                delay = self._get_char_delay(char)
-                time.sleep(delay / 1000.0)  # Convert to seconds
+                # Variable delay based on the word's characters
+                if self._is_watched():
+                    delay = sum(_CHAR_DELAYS.get(char) or BASE_CHAR_DELAY + next(_JITTER) for char in word)
+                    time.sleep(delay / 1000.0)  # Convert to seconds
             
             # Pause between chunks
             if chunk != chunks[-1]:
                 self._safe_console_insert(' ')
-                time.sleep(0.1)
+                self._typing_pause(0.1)
+    
+    def _is_watched(self):
+        """Whether the reply is on screen and followed; otherwise typing pauses are skipped"""
+        return self.console_visible and self.auto_scroll_enabled
+    
+    def _typing_pause(self, seconds):
+        if self._is_watched():
+            time.sleep(seconds)
     
     def _split_into_natural_chunks(self, text):
         """Split text into natural reading chunks"""
@@ -427,19 +444,26 @@ class AsyncSmoothResponseDisplay:
             if len(para) < 100:
                 chunks.append(para.strip())
             else:
-                sentences = re.split(r'(?<=[.!?])\s+', para)
-                current_chunk = ""
+                sentences = _SENTENCE_SPLIT_RE.split(para)
+                # Collect sentences and join once per chunk; length tracks the
+                # joined size (each sentence plus its separating space)
+                current_parts = []
+                length = 0
                 
                 for sentence in sentences:
-                    if len(current_chunk + sentence) < 120:
-                        current_chunk += sentence + " "
+                    if length + len(sentence) < 120:
+                        current_parts.append(sentence)
+                        length += len(sentence) + 1
                     else:
-                        if current_chunk.strip():
-                            chunks.append(current_chunk.strip())
-                        current_chunk = sentence + " "
+                        current_chunk = " ".join(current_parts).strip()
+                        if current_chunk:
+                            chunks.append(current_chunk)
+                        current_parts = [sentence]
+                        length = len(sentence) + 1
                 
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
+                current_chunk = " ".join(current_parts).strip()
+                if current_chunk:
+                    chunks.append(current_chunk)
             
             if para != paragraphs[-1]:
                 chunks.append('\n')
@@ -448,30 +472,15 @@ class AsyncSmoothResponseDisplay:
     
     def _get_char_delay(self, char):
         """Get delay for character (in milliseconds)"""
-        base_delay = 20
-        
-        if char in '.!?':
-            return base_delay * 4
-        elif char in ',;:':
-            return base_delay * 2
-        elif char == '\n':
-            return base_delay * 3
-        elif char == ' ':
-            return base_delay * 0.8
-        else:
-            import random
-            return base_delay + random.randint(-5, 8)
+        return _CHAR_DELAYS.get(char) or BASE_CHAR_DELAY + next(_JITTER)
     
     def _should_auto_scroll(self):
         """Check if should auto-scroll"""
         if not self.auto_scroll_enabled:
             return False
             
-        try:
-            top, bottom = self.console.yview()
-            return bottom > 0.8 and self.auto_scroll_enabled
-        except:
-            return self.auto_scroll_enabled
+        # Cached from yscrollcommand rather than asking Tk with yview() per batch
+        return self.view_bottom > 0.8
     
     def _setup_scroll_detection(self):
         """Setup scroll event detection"""
@@ -483,6 +492,14 @@ class AsyncSmoothResponseDisplay:
         self.console.bind('<Button-4>', on_manual_scroll)
         self.console.bind('<Button-5>', on_manual_scroll)
         self.console.bind('<Key>', lambda e: on_manual_scroll(e) if e.keysym in ['Up', 'Down', 'Page_Up', 'Page_Down'] else None)
+        
+        # Tk reports every view change (wheel, keyboard scrolling from the entry,
+        # inserts, see) here, so the auto-scroll check never has to query it
+        self.console.configure(yscrollcommand=self._on_view_change)
+    
+    def _on_view_change(self, first, last):
+        """yscrollcommand callback: remember where the view ends"""
+        self.view_bottom = float(last)
     
     def reset_scroll_state(self):
         """Reset scroll state"""
@@ -508,44 +525,9 @@ class AsyncSmoothResponseDisplay:
                 # Import here to avoid circular imports
                 from ..capabilities.agent import handle_agent_response
                 
-                # Create a custom console wrapper to capture output
-                class OutputCapture:
-                    def __init__(self, display_handler):
-                        self.display_handler = display_handler
-                        self.captured = []
-                    
-                    def insert(self, pos, text, tag=None):
-                        if pos == tk.END:
-                            self.captured.append((text, tag))
-                            self.display_handler._safe_console_insert(text, tag)
-                        # Ignore other positions for now
-                    
-                    def see(self, pos):
-                        # Auto-scroll is handled by the queue processor
-                        pass
-                    
-                    def after(self, delay, callback):
-                        # For simple callbacks, execute immediately in thread
-                        # For GUI updates, this should go through the queue
-                        if hasattr(callback, '__call__'):
-                            try:
-                                callback()
-                            except:
-                                pass
-                    
-                    def after_idle(self, callback):
-                        # Similar handling for after_idle
-                        if hasattr(callback, '__call__'):
-                            try:
-                                callback()
-                            except:
-                                pass
-                
-                # Create wrapped console
-                wrapped_console = OutputCapture(self)
-                
-                # Execute agent response
-                handle_agent_response(response, session_history, wrapped_console, self.status_label)
+                # Tool feedback and the final reply go through the GUI queue
+                handle_agent_response(response, session_history, self.console, self.status_label,
+                                      output_sink=self._safe_console_insert)
                 
                 # Finish up
                 time.sleep(0.2)  # Brief pause before finishing
@@ -561,7 +543,7 @@ class AsyncSmoothResponseDisplay:
                 self._safe_complete_callback(on_complete_callback)
         
         # Run agent work in background
-        self.executor.submit(execute_agent_work)
+        self.work_queue.put(execute_agent_work)
     
     def shutdown(self):
         """Clean shutdown of async components"""
@@ -570,8 +552,8 @@ class AsyncSmoothResponseDisplay:
         # Signal GUI queue processor to stop
         self._queue_gui_update("stop", ())
         
-        # Shutdown executor
-        self.executor.shutdown(wait=False)
+        # Stop the worker once queued jobs are done
+        self.work_queue.put(None)
 
 
 # Enhanced integration function for core.py
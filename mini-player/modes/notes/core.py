@@ -3,54 +3,66 @@ from tkinter import END
 from config import NOTES_FILE
 
 notes = []
+VERSION = 0 # Bumped whenever notes change, so views can skip identical re-renders
 
-def handle_command(cmd, console):
-    """Handles notes commands."""
-    if cmd.lower().startswith(("rm ", "remove ", "del ", "delete ")):
-        # Extract identifier (everything after the command)
-        parts = cmd.split(maxsplit=1)
-        if len(parts) > 1:
-            identifier = parts[1]
-            success, message, removed_note = remove_note(identifier)
-            
-            if success:
-                console.insert(END, f"[✓] {message}\n", "success")
-            else:
-                console.insert(END, f"[!] {message}\n", "warning")
-            
-            console.insert(END, "\nUpdated TODO List:\n", "accent")
-            display_notes(console)
-        else:
-            console.insert(END, "[!] Usage: rm <number> or rm <text>\n", "warning")
-            console.insert(END, "Examples: 'rm 1', 'rm groceries'\n", "dim")
-            
-    elif cmd.lower() in ("clear", "clear all", "reset"):
-        count = clear_all_notes()
-        console.insert(END, f"[✓] Cleared {count} tasks\n", "success")
-        console.insert(END, "\nTODO List (empty):\n", "accent")
-        display_notes(console)
-        
-    elif cmd.lower() in ("list", "show", "ls"):
-        console.insert(END, "\nYour TODO List:\n", "accent")
-        display_notes(console)
-        
-    elif cmd.lower() in ("help", "?"):
-        show_notes_help(console)
-        
+def handle_command(cmd):
+    """Handles notes commands; returns the reply as alternating (text, tag) chunks."""
+    # The caller writes the chunks with a single insert, so Tk does one update per command
+    verb, _, rest = cmd.partition(" ")
+    if verb.lower() in REMOVE_VERBS and rest.strip():
+        chunks = _remove_reply(rest.strip())
+    else:
+        # Table lookup on the whole lowercased command; anything else is a new note
+        chunks = NOTE_COMMANDS.get(cmd.lower(), _add_reply)(cmd)
+
+    return chunks
+
+def _remove_reply(identifier):
+    success, message, removed_note = remove_note(identifier)
+    
+    if success:
+        chunks = [f"[✓] {message}\n", "success"]
     else:
-        # Regular note addition
-        add_note(cmd)
-        console.insert(END, f"[+] Added: {cmd}\n", "success")
-        console.insert(END, "\nYour TODO List:\n", "accent")
-        display_notes(console)
+        chunks = [f"[!] {message}\n", "warning"]
+    
+    return chunks + ["\nUpdated TODO List:\n", "accent"] + notes_chunks()
+
+def _clear_reply(cmd):
+    count = clear_all_notes()
+    return [f"[✓] Cleared {count} tasks\n", "success",
+            "\nTODO List (empty):\n", "accent"] + notes_chunks()
+
+def _list_reply(cmd):
+    return ["\nYour TODO List:\n", "accent"] + notes_chunks()
+
+def _help_reply(cmd):
+    return [NOTES_HELP, "dim"]
+
+def _add_reply(cmd):
+    # Regular note addition
+    add_note(cmd)
+    return [f"[+] Added: {cmd}\n", "success",
+            "\nYour TODO List:\n", "accent"] + notes_chunks()
+
+REMOVE_VERBS = frozenset(("rm", "remove", "del", "delete"))
+
+NOTE_COMMANDS = {
+    "clear": _clear_reply, "clear all": _clear_reply, "reset": _clear_reply,
+    "list": _list_reply, "show": _list_reply, "ls": _list_reply,
+    "help": _help_reply, "?": _help_reply,
+}
 
 def load_notes():
-    global notes
+    global notes, VERSION
     if os.path.exists(NOTES_FILE):
         with open(NOTES_FILE, "r", encoding="utf-8") as f:
             notes = [line.strip() for line in f if line.strip()]
+        VERSION += 1
 
 def save_notes():
+    # Every mutation saves, so this is the one place to mark notes as changed
+    global VERSION
+    VERSION += 1
     with open(NOTES_FILE, "w", encoding="utf-8") as f:
         for note in notes:
             f.write(note + "\n")
@@ -113,22 +125,22 @@ def get_notes():
 def get_notes_count():
     return len(notes)
 
-def display_notes(console):
-    """Clean notes display with numbering"""
+def notes_chunks():
+    """Numbered notes list as alternating (text, tag) chunks for Text.insert"""
     notes = get_notes()
     if not notes:
-        console.insert(END, "  (no tasks yet)\n", "dim")
-        return
-        
-    for i, note in enumerate(notes, 1):
-        console.insert(END, f"  {i}. {note}\n")
+        return ["  (no tasks yet)\n", "dim"]
     
+    body = "".join(f"  {i}. {note}\n" for i, note in enumerate(notes, 1))
     # Show total count
-    console.insert(END, f"\nTotal: {len(notes)} task{'s' if len(notes) != 1 else ''}\n", "dim")
+    footer = f"\nTotal: {len(notes)} task{'s' if len(notes) != 1 else ''}\n"
+    return [body, "", footer, "dim"]
 
-def show_notes_help(console):
-    """Display help for notes mode"""
-    help_text = """
+def display_notes(console):
+    """Clean notes display with numbering"""
+    console.insert(END, *notes_chunks())
+
+NOTES_HELP = """
 Notes Mode Commands:
   <task>          - Add new task
   rm <number>     - Remove task by number (e.g., 'rm 1')
@@ -143,4 +155,7 @@ Examples:
   > rm groceries
   > clear
 """
-    console.insert(END, help_text, "dim")
\ No newline at end of file
+
+def show_notes_help(console):
+    """Display help for notes mode"""
+    console.insert(END, NOTES_HELP, "dim")
\ No newline at end of file
@@ -1,4 +1,5 @@
 # themes.py - Updated with minimal TUI theme
+from collections import namedtuple
 
 # Minimal TUI theme - clean, professional
 MINIMAL_THEME = {
@@ -114,18 +115,38 @@ THEMES = {
     "matrix": MATRIX_THEME
 }
 
+# Per-mode header/prompt styling, precomputed once per theme so mode
+# switches read attributes instead of formatting from nested dicts
+ModeStyle = namedtuple("ModeStyle", ["symbol", "color", "prompt", "ready_text"])
+
+for _theme in THEMES.values():
+    _theme["mode_styles"] = {
+        mode: ModeStyle(cfg["symbol"], cfg["color"], cfg["prompt"], f"{cfg['symbol']} Ready")
+        for mode, cfg in _theme["mode_config"].items()
+    }
+
+# Theme name -> the one after it, for Ctrl+T cycling without scanning the list
+_names = list(THEMES)
+NEXT_THEME = dict(zip(_names, _names[1:] + _names[:1]))
+
 # Current theme (changed to minimal)
 current_theme = "minimal"
+_current_theme_dict = THEMES[current_theme] # Refreshed by switch_theme
 
 def get_current_theme():
     """Get the currently active theme"""
-    return THEMES[current_theme]
+    return _current_theme_dict
+
+def get_current_theme_key():
+    """Get the name of the currently active theme"""
+    return current_theme
 
 def switch_theme(theme_name):
     """Switch to a different theme"""
-    global current_theme
+    global current_theme, _current_theme_dict
     if theme_name in THEMES:
         current_theme = theme_name
+        _current_theme_dict = THEMES[theme_name]
         return True
     return False
 
@@ -135,5 +156,4 @@ def get_available_themes():
 
 def get_theme_info():
     """Get info about current theme"""
-    theme = get_current_theme()
-    return f"Current theme: {theme['name']}"
\ No newline at end of file
+    return f"Current theme: {_current_theme_dict['name']}"
\ No newline at end of file